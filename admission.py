@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class AdmissionControl:
+    """
+    Decide whether to serve a new connection before reading anything from it.
+
+    Each source address gets a token bucket holding up to burst tokens, refilled at rate tokens per
+    second; a connection costs one token. Buckets are kept as (tokens, timestamp) tuples in an LRU
+    of at most max_clients entries, so memory stays flat when scanned from millions of addresses.
+    An evicted address simply starts over with a full bucket. On top of that, at most
+    max_connections connections are served at the same time.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: float = 10.0, max_clients: int = 65536,
+                 max_connections: int = 1000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.max_connections = max_connections
+        self.active = 0
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _take_token(self, address: str, now: float) -> bool:
+        buckets = self._buckets
+        bucket = buckets.get(address)
+        if bucket is None:
+            tokens = self.burst
+            if len(buckets) >= self.max_clients:
+                buckets.popitem(last=False)
+        else:
+            tokens, last = bucket
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            buckets.move_to_end(address)
+
+        if tokens < 1.0:
+            buckets[address] = (tokens, now)
+            return False
+        buckets[address] = (tokens - 1.0, now)
+        return True
+
+    def admit(self, address: str) -> bool:
+        """
+        Try to admit a connection from address. Every admitted connection must be release()d.
+        """
+        if self.active >= self.max_connections or not self._take_token(address, time.monotonic()):
+            self.rejected += 1
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Record that an admitted connection has closed
+        """
+        self.active -= 1
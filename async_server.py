@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Dict, Optional, Tuple
+
+import metrics
+from admission import AdmissionControl
+from config import Config, LiveConfig, Snapshot
+from hibernation import Hibernator, State
+from main import LISTEN_BACKLOG, build_disconnect, build_legacy_kick, encode_long, encode_packet, encode_var_int
+from login import format_eta, read_login_start, record_login
+from packet_reader import IncompletePacket, MalformedPacket, PacketBuffer, PacketTooLong
+from relay import Relay
+from versions import VERSIONS, Version
+from vhosts import normalize_host
+
+logger = logging.getLogger(__name__)
+
+
+# A handshake is at least 6 bytes (id, protocol, empty address, port, next state). Vanilla clients send at most
+# 255 characters of address, but BungeeCord IP forwarding appends "\0<ip>\0<uuid>\0<properties JSON>" with the
+# signed skin textures, so allow any protocol string: up to 32767 characters of up to 3 UTF-8 bytes each
+MAX_STRING_LENGTH = 32767
+MIN_HANDSHAKE_LENGTH = 6
+MAX_HANDSHAKE_LENGTH = 1 + 5 + 3 + 3 * MAX_STRING_LENGTH + 2 + 5  # id, protocol, address length and text, port, state
+# Status request is 1 byte, ping 9. Login Start is at most about 700 bytes, with 1.19's signature data.
+MAX_STATUS_LENGTH = 16
+MAX_LOGIN_START_LENGTH = 1024
+HANDSHAKE_ID = 0x00
+LEGACY_PING = 0xFE
+
+
+async def read_var_int(reader: asyncio.StreamReader, first: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Read a VarInt from a stream. Callers bound the time it may take with a deadline around the connection.
+    @param first: First byte of the VarInt, if it has already been read
+    """
+    result = 0
+    for bytes_read in range(5):
+        if bytes_read == 0 and first is not None:
+            read = first
+        else:
+            read = (await reader.readexactly(1))[0]
+        value = read & 0b01111111
+        result |= (value << (7 * bytes_read))
+
+        if read & 0b10000000 == 0:
+            return result, bytes_read + 1
+
+    raise MalformedPacket("More than 5 bytes in VarInt")
+
+
+async def read_packet(reader: asyncio.StreamReader, max_length: int) -> Tuple[int, PacketBuffer]:
+    """
+    Read a complete length-prefixed packet from a stream
+    @param max_length: Longest packet to accept. Longer ones raise PacketTooLong before any of it is read.
+    @return: The packet id and a buffer positioned at the packet contents
+    """
+    length, _ = await read_var_int(reader)
+    if length > max_length:
+        raise PacketTooLong(f"Packet of {length} bytes, at most {max_length} expected")
+    packet = PacketBuffer(await reader.readexactly(length))
+    packet_id, _ = packet.read_var_int()
+    return packet_id, packet
+
+
+def take_buffered(reader: asyncio.StreamReader) -> bytes:
+    """
+    Remove and return whatever a stream has received but not handed out yet, e.g. a Login Start that
+    arrived together with the handshake.
+
+    StreamReader has no public way to do this, so this is the one place that touches its private
+    _buffer (a bytearray in CPython 3.7 up to at least 3.13). Reading must be paused first, or more
+    data could be appended after the buffer is taken.
+    """
+    buffer = getattr(reader, "_buffer", None)
+    if not isinstance(buffer, bytearray):
+        raise RuntimeError("asyncio.StreamReader no longer keeps its data in _buffer, update take_buffered()")
+    pending = bytes(buffer)
+    buffer.clear()
+    return pending
+
+
+def detach_socket(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Tuple[socket.socket, bytes]:
+    """
+    Take a connection away from asyncio so it can be relayed by blocking threads
+    @return: A blocking duplicate of the client socket, and data asyncio had already buffered from it
+    """
+    writer.transport.pause_reading()
+    pending = take_buffered(reader)
+    transport_socket = writer.get_extra_info("socket")
+    client = socket.socket(fileno=os.dup(transport_socket.fileno()))
+    client.setblocking(True)
+    return client, pending
+
+
+def connect_backend(hibernator: Hibernator, initial: bytes) -> socket.socket:
+    """
+    Blocking: connect to the backend and replay what the client has sent so far
+    """
+    backend = socket.create_connection((hibernator.backend_host, hibernator.backend_port))
+    try:
+        backend.sendall(initial)
+    except BaseException:
+        backend.close()
+        raise
+    return backend
+
+
+async def proxy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, initial: bytes,
+                hibernator: Hibernator, joined_at: Optional[float]) -> None:
+    """
+    Splice a client through to the running backend
+    @param initial: Data already read from the client, e.g. its handshake, to replay to the backend
+    @param joined_at: Time the join packet came in, to measure join latency. None for status pings.
+    """
+    client, pending = detach_socket(reader, writer)
+    replayed = initial + pending
+    try:
+        backend = await asyncio.to_thread(connect_backend, hibernator, replayed)
+    except BaseException:
+        client.close()
+        raise
+
+    loop = asyncio.get_running_loop()
+    on_first_byte = None
+    if joined_at is not None:
+        def on_first_byte() -> None:
+            # Called from a relay thread, metrics are only updated on the event loop
+            loop.call_soon_threadsafe(hibernator.record_join_latency, time.monotonic() - joined_at)
+
+    done = loop.create_future()
+    relay = Relay(client, backend, on_first_byte=on_first_byte)
+    relay.client_to_backend = len(replayed)
+    if joined_at is not None:
+        hibernator.session_started()
+    try:
+        relay.start(lambda finished: loop.call_soon_threadsafe(done.set_result, finished))
+        await done
+    finally:
+        if joined_at is not None:
+            hibernator.session_ended(writer.get_extra_info("peername")[0], time.monotonic() - joined_at)
+    logger.debug("Relay closed: %d bytes up, %d bytes down", relay.client_to_backend, relay.backend_to_client)
+
+
+def start_message(hibernator: Optional[Hibernator], config: Config) -> str:
+    """
+    @return: Disconnect message for a player whose join is starting the backend
+    """
+    eta = hibernator.eta() if hibernator is not None else None
+    if eta is None:
+        return config.start_message
+    return config.start_message_eta.format(eta=format_eta(eta))
+
+
+async def handle_login(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, protocol_version: int,
+                       version: Version, hibernator: Optional[Hibernator], snapshot: Snapshot) -> None:
+    """
+    Read Login Start, record who is joining, wake the backend and tell the player when to come back.
+    Players missing from the whitelist are kicked without touching the backend.
+    """
+    config, whitelist = snapshot.config, snapshot.whitelist
+    metrics.JOIN_ATTEMPTS.inc()
+    packet_id, packet = await read_packet(reader, MAX_LOGIN_START_LENGTH)
+    if packet_id != 0:
+        metrics.UNKNOWN_PACKETS.inc()
+        return
+    name, uuid = read_login_start(packet, protocol_version)
+    address = writer.get_extra_info("peername")[0]
+    record_login(address, name, uuid)
+    allowed = whitelist is None or whitelist.allows(name, uuid)
+    if hibernator is not None and hibernator.history is not None:
+        hibernator.history.record_join(address, name, uuid, allowed)
+
+    if not allowed:
+        metrics.REJECTED_WAKEUPS.inc()
+        writer.write(build_disconnect(config.not_whitelisted_message, version.login_disconnect))
+        await writer.drain()
+        return
+
+    if hibernator is not None:
+        hibernator.wake(name)
+    writer.write(build_disconnect(start_message(hibernator, config), version.login_disconnect))
+    await writer.drain()
+
+
+def legacy_kick(hibernator: Optional[Hibernator], config: Config) -> bytes:
+    """
+    @return: The cached legacy ping response for the current state
+    """
+    starting = hibernator is not None and hibernator.state == State.STARTING
+    return build_legacy_kick(config.motd_starting if starting else config.motd, 0, config.max_players,
+                             config.server_protocol)
+
+
+async def handle_client_stream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, snapshot: Snapshot,
+                               hibernator: Optional[Hibernator] = None,
+                               hibernators: Optional[Dict[str, Hibernator]] = None) -> None:
+    """
+    Serve one connection: answer status pings and wake the backend on join while it is down,
+    proxy to it while it is up.
+
+    :param reader:
+    :param writer:
+    :param snapshot: Settings to serve this connection with, from when it was accepted
+    :param hibernator: State of the real server, None to only spoof the status
+    :param hibernators: State of each virtual server's backend by name, for those that have one
+    """
+    config = snapshot.config
+    read_timeout = config.read_timeout
+    client_address = writer.get_extra_info("peername")
+    logger.debug("Received a connection from %s:%d", *client_address[:2])
+
+    try:
+        # One deadline for everything the client sends before we answer or start proxying
+        async with asyncio.timeout(read_timeout) as deadline:
+            # Dispatch on the first byte: legacy ping, start of a handshake, or garbage
+            first = (await reader.readexactly(1))[0]
+            if first == LEGACY_PING:
+                metrics.LEGACY_PINGS.inc()
+                if hibernator is not None and hibernator.is_up:
+                    deadline.reschedule(None)
+                    await proxy(reader, writer, bytes((first,)), hibernator, None)
+                else:
+                    writer.write(legacy_kick(hibernator, config))
+                    await writer.drain()
+                return
+
+            length, _ = await read_var_int(reader, first)
+            if not MIN_HANDSHAKE_LENGTH <= length <= MAX_HANDSHAKE_LENGTH:
+                metrics.UNKNOWN_PACKETS.inc()
+                logger.debug("Dropping %s: %d is not a handshake length", client_address[0], length)
+                return
+            # Check the packet id before waiting for the rest, so probes like "GET " or a TLS ClientHello,
+            # whose first byte passes for a handshake length, are dropped right away
+            packet_id = (await reader.readexactly(1))[0]
+            if packet_id != HANDSHAKE_ID:
+                metrics.UNKNOWN_PACKETS.inc()
+                logger.debug("Unknown packet id %d from %s", packet_id, client_address[0])
+                return
+            handshake = PacketBuffer(await reader.readexactly(length - 1))
+            joined_at = time.monotonic()
+            parse_start = time.perf_counter()
+            protocol_version, _ = handshake.read_var_int()
+            server_address, _ = handshake.read_string()
+            server_port, _ = handshake.read_unsigned_short()
+            next_state, _ = handshake.read_var_int()
+            if snapshot.routes:
+                server = snapshot.routes.get(normalize_host(server_address))
+                if server is not None:
+                    snapshot, config = server, server.config
+                    hibernator = hibernators.get(server.name) if hibernators is not None else None
+            metrics.HANDSHAKE_PARSE.observe(time.perf_counter() - parse_start)
+            version = VERSIONS.compatible(protocol_version, config.server_protocol)
+
+            if hibernator is not None and hibernator.is_up:
+                initial = encode_var_int(length) + bytes((HANDSHAKE_ID,)) + handshake.data
+                deadline.reschedule(None)
+                await proxy(reader, writer, initial, hibernator, joined_at if next_state == 2 else None)
+                return
+
+            if next_state == 2:
+                await handle_login(reader, writer, protocol_version, version, hibernator, snapshot)
+                return
+
+            # Request packet should follow (length 1 packet id 0 no other info)
+            await read_packet(reader, MAX_STATUS_LENGTH)
+            starting = hibernator is not None and hibernator.state == State.STARTING
+            send_start = time.perf_counter()
+            motd = config.motd_starting if starting else config.motd
+            writer.write(snapshot.status_cache.get(protocol_version, motd, 0, config.max_players))
+            metrics.STATUS_SEND.observe(time.perf_counter() - send_start)
+            metrics.STATUS_PINGS.inc()
+
+            # Expect a ping request, reply with a pong carrying the same payload
+            packet_id, payload = await read_packet(reader, MAX_STATUS_LENGTH)
+            if packet_id == 1:
+                writer.write(encode_packet(version.pong, encode_long(payload.read_long()[0])))
+            await writer.drain()
+    except ValueError as e:
+        # Garbage: malformed or oversized packets, or strings that are not UTF-8
+        metrics.UNKNOWN_PACKETS.inc()
+        logger.debug("Dropping %s:%d: %s", client_address[0], client_address[1], e)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, IncompletePacket, OSError) as e:
+        logger.debug("Dropping %s:%d: %r", client_address[0], client_address[1], e)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(host: str, port: int, backlog: int = LISTEN_BACKLOG, hibernator: Optional[Hibernator] = None,
+                admission: Optional[AdmissionControl] = None, reuse_port: bool = False,
+                config: Optional[LiveConfig] = None, hibernators: Optional[Dict[str, Hibernator]] = None) -> None:
+    """
+    Accept connections concurrently until cancelled.
+
+    :param host:
+    :param port:
+    :param backlog: Size of the kernel accept queue
+    :param hibernator: State of the real server, None to only spoof the status
+    :param admission: Rate limits applied before anything is read, None to admit everyone
+    :param reuse_port: Bind with SO_REUSEPORT so several worker processes can share the port
+    :param config: Settings each connection takes a snapshot of, the settings from main.py by default
+    :param hibernators: State of each virtual server's backend by name, for those that have one
+    """
+    if config is None:
+        config = LiveConfig()
+
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        metrics.CONNECTIONS.inc()
+        if admission is None:
+            await handle_client_stream(reader, writer, config.current, hibernator, hibernators)
+            return
+        if not admission.admit(writer.get_extra_info("peername")[0]):
+            # Reset without reading, parsing or logging anything
+            metrics.REJECTED_CONNECTIONS.inc()
+            writer.transport.abort()
+            return
+        try:
+            await handle_client_stream(reader, writer, config.current, hibernator, hibernators)
+        finally:
+            admission.release()
+
+    server = await asyncio.start_server(on_connect, host, port, backlog=backlog, reuse_address=True,
+                                        reuse_port=reuse_port or None)
+    logger.info("Listening on %s:%d", host, port)
+    async with server:
+        await server.serve_forever()
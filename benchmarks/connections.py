@@ -0,0 +1,86 @@
+"""
+Measure status-ping connections per second for the serial and asyncio listeners.
+
+Usage: python benchmarks/connections.py [--clients N] [--concurrency C] [--stalled S]
+
+Stalled clients connect and never send anything; with the serial listener the
+first one blocks every following ping, with the asyncio listener they only
+cost a file descriptor until their read deadline expires.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from async_server import serve  # noqa: E402
+
+
+def status_ping_bytes() -> bytes:
+    handshake = main.encode_var_int(751) + main.encode_string("localhost") \
+        + bytearray((25565).to_bytes(2, "big")) + main.encode_var_int(1)
+    return bytes(main.encode_packet(0, handshake) + main.encode_packet(0, bytearray())
+                 + main.encode_packet(1, main.encode_long(int(time.time()))))
+
+
+async def one_client(port: int, request: bytes) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request)
+    await writer.drain()
+    # The server closes the connection after the pong
+    await reader.read()
+    writer.close()
+
+
+async def run_clients(port: int, clients: int, concurrency: int, stalled: int, timeout: float) -> float:
+    request = status_ping_bytes()
+    idle = [await asyncio.open_connection("127.0.0.1", port) for _ in range(stalled)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited() -> None:
+        async with semaphore:
+            await one_client(port, request)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.gather(*(limited() for _ in range(clients))), timeout)
+    except asyncio.TimeoutError:
+        return 0.0
+    finally:
+        for _, writer in idle:
+            writer.close()
+    return clients / (time.perf_counter() - start)
+
+
+def start_serial(port: int) -> None:
+    threading.Thread(target=main.serve_serial, args=("127.0.0.1", port), daemon=True).start()
+
+
+def start_async(port: int) -> None:
+    def run() -> None:
+        asyncio.run(serve("127.0.0.1", port))
+    threading.Thread(target=run, daemon=True).start()
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--stalled", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    for name, starter, port in (("serial", start_serial, 25601), ("asyncio", start_async, 25602)):
+        starter(port)
+        time.sleep(0.3)
+        rate = asyncio.run(run_clients(port, args.clients, args.concurrency, args.stalled, args.timeout))
+        result = f"{rate:10.0f} conn/s" if rate else "  timed out (listener blocked)"
+        print(f"{name:>8}: {result}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,84 @@
+"""
+Fill a history database with a year of synthetic activity and time the aggregate queries.
+
+Usage: python benchmarks/history_queries.py [--joins-per-day N] [--path FILE]
+
+Also measures the cost of recording a join on the accept path, which only appends to the batch.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import DAY, HistoryStore  # noqa: E402
+
+
+def fill(store: HistoryStore, days: int, joins_per_day: int) -> None:
+    players = [f"player{index}" for index in range(500)]
+    now = time.time()
+    start = now - days * DAY
+    batch = []
+    for day in range(days):
+        base = start + day * DAY
+        for _ in range(joins_per_day):
+            # Evenings are busier
+            timestamp = base + random.triangular(0, DAY, 20 * 3600)
+            batch.append(("joins", (timestamp, "10.0.0.1", random.choice(players), None, 1)))
+            batch.append(("sessions", (timestamp, "10.0.0.1", random.expovariate(1 / 1800))))
+        for _ in range(random.randint(1, 4)):
+            timestamp = base + random.uniform(0, DAY)
+            batch.append(("wakeups", (timestamp, random.choice(players))))
+            batch.append(("boots", (timestamp, random.gauss(90, 15))))
+        if len(batch) > 50000:
+            store._write(batch)
+            batch = []
+    store._write(batch)
+
+
+def timed(label: str, function, *args) -> None:
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    summary = result if not isinstance(result, list) or len(result) <= 5 else f"{len(result)} rows"
+    print(f"{label:>28}: {elapsed * 1000:8.2f} ms  {summary}")
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--joins-per-day", type=int, default=1000)
+    parser.add_argument("--path", help="Database to create, a temporary file by default")
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    store = HistoryStore(args.path or os.path.join(directory.name, "history.sqlite3"))
+    start = time.perf_counter()
+    fill(store, 365, args.joins_per_day)
+    print(f"Filled {365 * args.joins_per_day} joins in {time.perf_counter() - start:.1f} s")
+
+    count = 100000
+    start = time.perf_counter()
+    for _ in range(count):
+        store.record_join("10.0.0.1", "someone", None)
+    print(f"{'record_join':>28}: {(time.perf_counter() - start) / count * 1e9:8.0f} ns")
+    start = time.perf_counter()
+    store.flush()
+    print(f"{'flush 100000 joins':>28}: {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    now = time.time()
+    timed("median boot time, 7 days", store.median_boot_time, now - 7 * DAY)
+    timed("median boot time, 365 days", store.median_boot_time, now - 365 * DAY)
+    timed("busiest hours, 365 days", store.busiest_hours, now - 365 * DAY)
+    timed("hourly joins, 365 days", store.hourly_joins, now - 365 * DAY)
+    timed("player joins, 365 days", store.player_joins, "player7", now - 365 * DAY)
+    timed("median session, 7 days", store.median_session_time, now - 7 * DAY)
+    timed("last 100 boot times", store.boot_times, 100)
+    store.close()
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main_benchmark()
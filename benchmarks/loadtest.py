@@ -0,0 +1,211 @@
+"""
+Load test a running spoofer with simulated Minecraft clients and report latency as JSON.
+
+Usage: python benchmarks/loadtest.py [--host H] [--port P] [--scenario status|login|legacy]...
+                                     [--connections N] [--concurrency C] [--spawn] [--output FILE]
+                                     [--max-error-rate F]
+
+Each simulated client opens a connection, speaks the client side of one flow and waits for the
+server to close the connection:
+  status  handshake, status request, ping, until the pong
+  login   handshake with next state 2, Login Start, until the disconnect message
+  legacy  pre-1.7 0xFE server list ping, until the kick packet
+
+Latency is measured from connect to close. With --spawn an asyncio listener without a backend is
+started on the port first, so joins are answered without waking anything. Against a real
+instance, login joins wake the backend like a player would.
+
+A real instance applies its admission control to the load test too: all simulated clients share
+one source address, so beyond rate_limit_burst connections nearly all of them are reset. Raise
+rate_limit_per_second and rate_limit_burst well above the test's connection rate in its config file
+and restart it for the test. The spawned listener has no admission control. If more than
+--max-error-rate of a scenario's connections fail, a warning is printed and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+from login import PROTOCOL_1_19, PROTOCOL_1_19_3, PROTOCOL_1_20_2  # noqa: E402
+
+SCENARIOS = ("status", "login", "legacy")
+
+SERVER = f"""
+import asyncio, sys
+sys.path.insert(0, {ROOT!r})
+from async_server import serve
+asyncio.run(serve("127.0.0.1", int(sys.argv[1])))
+"""
+
+
+def handshake(protocol: int, port: int, next_state: int) -> bytearray:
+    data = main.encode_var_int(protocol) + main.encode_string("localhost") \
+        + bytearray(port.to_bytes(2, "big")) + main.encode_var_int(next_state)
+    return main.encode_packet(0, data)
+
+
+def status_request(protocol: int, port: int) -> bytes:
+    return bytes(handshake(protocol, port, 1) + main.encode_packet(0, bytearray())
+                 + main.encode_packet(1, main.encode_long(int(time.time()))))
+
+
+def login_request(protocol: int, port: int, name: str = "LoadTest") -> bytes:
+    body = main.encode_string(name)
+    if protocol >= PROTOCOL_1_20_2:
+        body += uuid.uuid4().bytes
+    elif protocol >= PROTOCOL_1_19_3:
+        body += b"\x01" + uuid.uuid4().bytes
+    elif protocol >= PROTOCOL_1_19:
+        # No signature data, and for 1.19.1 no UUID either
+        body += b"\x00" * (1 if protocol == PROTOCOL_1_19 else 2)
+    return bytes(handshake(protocol, port, 2) + main.encode_packet(0, body))
+
+
+def legacy_request() -> bytes:
+    return b"\xfe\x01"
+
+
+def build_request(scenario: str, protocol: int, port: int) -> bytes:
+    if scenario == "status":
+        return status_request(protocol, port)
+    if scenario == "login":
+        return login_request(protocol, port)
+    return legacy_request()
+
+
+async def one_client(host: str, port: int, request: bytes, timeout: float) -> float:
+    """
+    @return: Seconds from connecting until the server closed the connection
+    """
+    start = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(request)
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    if not response:
+        raise ConnectionError("Closed without a response")
+    return time.perf_counter() - start
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """
+    @return: Nearest-rank percentile of an already sorted list
+    """
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_scenario(host: str, port: int, request: bytes, connections: int, concurrency: int,
+                       timeout: float) -> Dict[str, object]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = connections
+
+    async def client_loop() -> None:
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            try:
+                latencies.append(await one_client(host, port, request, timeout))
+            except (asyncio.TimeoutError, OSError):
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(min(concurrency, connections))))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result: Dict[str, object] = {
+        "connections": connections,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "connections_per_second": round(len(latencies) / elapsed, 1),
+    }
+    if latencies:
+        result["latency_ms"] = {
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        }
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=main.LISTEN_PORT)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append",
+                        help="Flow to simulate, repeat for several; all by default")
+    parser.add_argument("--protocol", type=int, default=main.SERVER_PROTOCOL,
+                        help="Protocol version the clients announce")
+    parser.add_argument("--connections", type=int, default=5000, help="Connections per scenario")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--spawn", action="store_true", help="Start a backend-less listener on the port first")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--max-error-rate", type=float, default=0.5,
+                        help="Fail if a larger fraction of a scenario's connections fail")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, "-c", SERVER, str(args.port)], stderr=subprocess.DEVNULL)
+        time.sleep(1.0)
+    try:
+        results = {}
+        for scenario in args.scenario or SCENARIOS:
+            request = build_request(scenario, args.protocol, args.port)
+            results[scenario] = asyncio.run(run_scenario(args.host, args.port, request, args.connections,
+                                                         args.concurrency, args.timeout))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": int(time.time()),
+        "target": f"{args.host}:{args.port}",
+        "protocol": args.protocol,
+        "scenarios": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    failed = [scenario for scenario, result in results.items()
+              if result["errors"] > args.max_error_rate * result["connections"]]
+    for scenario in failed:
+        print(f"Warning: {results[scenario]['errors']} of {results[scenario]['connections']} {scenario} connections "
+              f"failed, is the target rate limiting this host?", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,97 @@
+"""
+Measure relay throughput with many simulated players pushing chunk-sized payloads
+through the relay to a local echo backend.
+
+Usage: python benchmarks/relay_throughput.py [--players N] [--payload BYTES] [--rounds R]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relay import SPLICE_AVAILABLE, Relay  # noqa: E402
+
+
+def listen() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1024)
+    return sock
+
+
+def echo_backend(sock: socket.socket) -> None:
+    def echo(conn: socket.socket) -> None:
+        buffer = memoryview(bytearray(65536))
+        while True:
+            received = conn.recv_into(buffer)
+            if not received:
+                break
+            conn.sendall(buffer[:received])
+        conn.close()
+
+    while True:
+        conn, _ = sock.accept()
+        threading.Thread(target=echo, args=(conn,), daemon=True).start()
+
+
+def relay_listener(sock: socket.socket, backend_port: int, use_splice: bool, relays: list) -> None:
+    while True:
+        client, _ = sock.accept()
+        backend = socket.create_connection(("127.0.0.1", backend_port))
+        relay = Relay(client, backend, use_splice=use_splice)
+        relays.append(relay)
+        relay.start()
+
+
+def player(port: int, payload: bytes, rounds: int) -> None:
+    sock = socket.create_connection(("127.0.0.1", port))
+    buffer = memoryview(bytearray(len(payload)))
+    for _ in range(rounds):
+        sock.sendall(payload)
+        received = 0
+        while received < len(payload):
+            received += sock.recv_into(buffer[received:])
+    sock.close()
+
+
+def run(use_splice: bool, backend_port: int, players: int, payload: bytes, rounds: int) -> None:
+    listener = listen()
+    relays: list = []
+    threading.Thread(target=relay_listener, args=(listener, backend_port, use_splice, relays), daemon=True).start()
+
+    threads = [threading.Thread(target=player, args=(listener.getsockname()[1], payload, rounds))
+               for _ in range(players)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    relayed = sum(relay.client_to_backend + relay.backend_to_client for relay in relays)
+    name = "splice" if use_splice else "recv_into"
+    print(f"{name:>9}: {relayed / elapsed / 1e6:8.1f} MB/s relayed ({players} players, {elapsed:.2f} s)")
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--payload", type=int, default=32 * 1024, help="Bytes per simulated chunk packet")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    backend = listen()
+    threading.Thread(target=echo_backend, args=(backend,), daemon=True).start()
+    payload = os.urandom(args.payload)
+
+    modes = [True, False] if SPLICE_AVAILABLE else [False]
+    for use_splice in modes:
+        run(use_splice, backend.getsockname()[1], args.players, payload, args.rounds)
+
+
+if __name__ == "__main__":
+    main_benchmark()
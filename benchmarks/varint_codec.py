@@ -0,0 +1,84 @@
+"""
+Compare the varint module against the original per-byte VarInt implementations.
+
+Usage: python benchmarks/varint_codec.py [--number N]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import varint  # noqa: E402
+
+
+def original_encode_var_int(value: int) -> bytearray:
+    """
+    main.encode_var_int before the varint module
+    """
+    result = bytearray(0)
+    for i in range(100):
+        temp = value & 0b01111111
+        value = (value >> 7) if value >= 0 else ((value + (1 << 32)) >> 7)
+        if value != 0:
+            temp |= 0b10000000
+        result.append(temp)
+        if value == 0:
+            return result
+
+
+def original_decode_var_int(data: bytes, pos: int = 0) -> tuple:
+    """
+    main.read_var_int before the varint module, reading from a buffer instead of recv(1)
+    """
+    result = 0
+    for bytes_read in range(5):
+        read = data[pos + bytes_read]
+        value = read & 0b01111111
+        result |= (value << (7 * bytes_read))
+
+        if read & 0b10000000 == 0:
+            return result, bytes_read + 1
+
+    raise Exception("More than 5 bytes in VarInt")
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    cases = {
+        "1 byte": 100,
+        "2 bytes": 5000,
+        "5 bytes": 2 ** 31 - 1,
+    }
+    for name, value in cases.items():
+        encoded = bytes(original_encode_var_int(value))
+        assert varint.encode_var_int(value) == encoded
+        assert varint.decode_var_int(encoded) == original_decode_var_int(encoded)
+
+        for operation, old, new in (
+                ("encode", lambda: original_encode_var_int(value), lambda: varint.encode_var_int(value)),
+                ("decode", lambda: original_decode_var_int(encoded), lambda: varint.decode_var_int(encoded)),
+        ):
+            old_time = timeit.timeit(old, number=args.number)
+            new_time = timeit.timeit(new, number=args.number)
+            print(f"{operation} {name:>7}: {old_time / args.number * 1e9:7.0f} ns -> "
+                  f"{new_time / args.number * 1e9:7.0f} ns ({old_time / new_time:4.1f}x)")
+
+    values = [random.randrange(0, 2 ** 21) for _ in range(10000)]
+    packed = varint.encode_var_ints(values)
+    assert varint.decode_var_ints(packed) == values
+    number = max(args.number // 10000, 1)
+    old_time = timeit.timeit(lambda: b"".join(bytes(original_encode_var_int(v)) for v in values), number=number)
+    new_time = timeit.timeit(lambda: varint.encode_var_ints(values), number=number)
+    print(f"bulk encode 10k: {old_time / number * 1e3:7.2f} ms -> {new_time / number * 1e3:7.2f} ms")
+    new_time = timeit.timeit(lambda: varint.decode_var_ints(packed), number=number)
+    print(f"bulk decode 10k: {new_time / number * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,56 @@
+"""
+Measure hostname routing cost as the number of virtual servers grows.
+
+Usage: python benchmarks/vhost_routing.py [--lookups N]
+
+Each server is routed by an exact name and a wildcard; lookups hit exact names, wildcards
+and unknown hosts, starting from the raw handshake address.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vhosts import HostRouter, normalize_host  # noqa: E402
+
+
+def build(servers: int) -> HostRouter:
+    router: HostRouter = HostRouter()
+    for index in range(servers):
+        router.add(f"server{index}.example.com", index)
+        router.add(f"*.server{index}.example.net", index)
+    return router
+
+
+def measure(router: HostRouter, addresses, lookups: int) -> float:
+    rounds = lookups // len(addresses)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for address in addresses:
+            router.get(normalize_host(address))
+    return (time.perf_counter() - start) / (rounds * len(addresses))
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=300000)
+    args = parser.parse_args()
+
+    for servers in (1, 10, 100, 1000, 10000):
+        router = build(servers)
+        last = servers - 1
+        cases = (
+            ("exact", [f"server{last}.example.com"]),
+            ("wildcard", [f"play.eu.server{last}.example.net"]),
+            ("forge", [f"server{last}.example.com\0FML2\0"]),
+            ("unknown", ["play.unknown.example.org"]),
+        )
+        timings = "  ".join(f"{name} {measure(router, addresses, args.lookups) * 1e9:5.0f} ns"
+                            for name, addresses in cases)
+        print(f"{servers:6} servers: {timings}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
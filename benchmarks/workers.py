@@ -0,0 +1,101 @@
+"""
+Measure status-ping throughput with 1, 2, 4, ... SO_REUSEPORT worker processes.
+
+Usage: python benchmarks/workers.py [--max-workers N] [--clients P] [--concurrency C] [--duration S]
+
+Load is generated by P client processes so the load generator itself is not the bottleneck.
+Run it on a multi-core Linux machine; with a single core the workers only compete for it.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+
+PORT = 25610
+
+SERVER = f"""
+import sys
+sys.path.insert(0, {ROOT!r})
+import main
+main.DEBUG = False
+main.LISTEN_HOST = "127.0.0.1"
+main.LISTEN_PORT = {PORT}
+main.METRICS_PORT = None
+main.RATE_LIMIT_PER_SECOND = main.RATE_LIMIT_BURST = 1e9
+main.MAX_CONNECTIONS = 100000
+sys.argv = ["main.py", "--workers", sys.argv[1]]
+main.main()
+"""
+
+
+def status_ping_bytes() -> bytes:
+    handshake = main.encode_var_int(main.SERVER_PROTOCOL) + main.encode_string("localhost") \
+        + bytearray(PORT.to_bytes(2, "big")) + main.encode_var_int(1)
+    return bytes(main.encode_packet(0, handshake) + main.encode_packet(0, bytearray())
+                 + main.encode_packet(1, main.encode_long(1)))
+
+
+async def ping_loop(request: bytes, deadline: float) -> int:
+    count = 0
+    while time.monotonic() < deadline:
+        reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+        writer.write(request)
+        await reader.read()
+        writer.close()
+        count += 1
+    return count
+
+
+def client_process(concurrency: int, duration: float, results: "multiprocessing.Queue") -> None:
+    async def run() -> int:
+        deadline = time.monotonic() + duration
+        counts = await asyncio.gather(*(ping_loop(status_ping_bytes(), deadline) for _ in range(concurrency)))
+        return sum(counts)
+    results.put(asyncio.run(run()))
+
+
+def measure(workers: int, clients: int, concurrency: int, duration: float) -> float:
+    server = subprocess.Popen([sys.executable, "-c", SERVER, str(workers)], stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1.0)
+        results: multiprocessing.Queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=client_process, args=(concurrency, duration, results))
+                     for _ in range(clients)]
+        for process in processes:
+            process.start()
+        total = sum(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        return total / duration
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    workers = 1
+    baseline = None
+    while workers <= args.max_workers:
+        rate = measure(workers, args.clients, args.concurrency, args.duration)
+        baseline = baseline or rate
+        print(f"{workers:3} workers: {rate:10.0f} pings/s ({rate / baseline:4.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main_benchmark()
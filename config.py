@@ -0,0 +1,326 @@
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import signal
+import tomllib
+import typing
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import main
+from favicon import Favicon
+from filewatch import FileWatch
+from main import StatusCache
+from versions import VERSIONS
+from vhosts import HostRouter
+from whitelist import Whitelist
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class Config:
+    """
+    Typed copy of the settings in main.py, with the defaults taken from there and optionally
+    overridden by a TOML or JSON file of the same names in lowercase, e.g. motd = "...".
+
+    Settings in RELOADABLE take effect for new connections when the file is reloaded; changing any
+    other setting needs a restart.
+
+    servers lists virtual servers sharing the listener, each a table with "hosts" (hostnames or
+    wildcards like "*.example.com"), an optional "name" and any settings that differ from the top
+    level ones, typically the MOTD and the backend. Clients are routed by the hostname in their
+    handshake; other hostnames and legacy pings get the top level server.
+    """
+    debug: bool
+    listen_host: str
+    listen_port: int
+    listen_backlog: int
+    read_timeout: float
+
+    server_protocol: int
+    max_players: int
+    motd: str
+    motd_starting: str
+    favicon_file: str
+    start_message: str
+    start_message_eta: str
+    not_whitelisted_message: str
+    whitelist_files: List[str]
+
+    backend_host: str
+    backend_port: int
+    backend_start_command: Optional[List[str]]
+    backend_start_url: Optional[str]
+    backend_stop_url: Optional[str]
+    backend_start_timeout: float
+    idle_timeout: float
+    idle_poll_interval: float
+    idle_max_poll_interval: float
+
+    rate_limit_per_second: float
+    rate_limit_burst: float
+    rate_limit_tracked_clients: int
+    max_connections: int
+
+    history_file: Optional[str]
+    history_flush_interval: float
+
+    prewarm_threshold: Optional[float]
+    prewarm_weeks: int
+    prewarm_min_weeks: int
+    prewarm_lead_time: Optional[float]
+    prewarm_grace: float
+
+    metrics_host: str
+    metrics_port: Optional[int]
+    metrics_dump_file: Optional[str]
+    metrics_dump_interval: float
+
+    servers: List[dict]
+
+    @classmethod
+    def from_settings(cls) -> "Config":
+        """
+        @return: The settings as they are in main.py
+        """
+        return cls(**{field.name: getattr(main, field.name.upper()) for field in dataclasses.fields(cls)})
+
+    def replace(self, values: Dict[str, Any]) -> "Config":
+        """
+        @return: A copy with the given settings changed, after checking their names and types
+        """
+        hints = typing.get_type_hints(type(self))
+        checked = {}
+        for name, value in values.items():
+            if name not in hints:
+                raise ValueError(f"Unknown setting {name!r}")
+            checked[name] = _check(name, value, hints[name])
+        return dataclasses.replace(self, **checked)
+
+    def virtual_servers(self) -> List["VirtualServer"]:
+        """
+        @return: The servers in servers, with their settings on top of these ones. Unless a server sets
+        its own history_file, its history goes next to the top level one, suffixed with its name.
+        """
+        servers = []
+        for entry in self.servers:
+            values = dict(entry)
+            hosts = values.pop("hosts", None)
+            if not isinstance(hosts, list) or not hosts or not all(isinstance(host, str) for host in hosts):
+                raise ValueError("Every server needs a list of hosts")
+            name = values.pop("name", hosts[0])
+            if not isinstance(name, str):
+                raise ValueError(f"Server name must be a string, not {name!r}")
+            if "servers" in values:
+                raise ValueError(f"Server {name!r} cannot have servers of its own")
+            if "history_file" not in values and self.history_file is not None:
+                stem, extension = os.path.splitext(self.history_file)
+                values["history_file"] = f"{stem}-{name}{extension}"
+            servers.append(VirtualServer(name, hosts, dataclasses.replace(self.replace(values), servers=[])))
+        if len({server.name for server in servers}) != len(servers):
+            raise ValueError("Server names must be unique")
+        return servers
+
+
+class VirtualServer(NamedTuple):
+    """
+    A server behind the shared listener, reached by hostname
+    """
+    name: str
+    hosts: List[str]
+    config: Config
+
+
+RELOADABLE = frozenset((
+    "read_timeout", "server_protocol", "max_players", "motd", "motd_starting", "favicon_file", "start_message",
+    "start_message_eta", "not_whitelisted_message", "whitelist_files", "servers",
+))
+
+# Settings that go into the cached status packets
+_STATUS_INPUTS = ("server_protocol", "favicon_file")
+
+
+def _check(name: str, value: Any, expected: Any) -> Any:
+    """
+    @return: The value, if it is of the expected type. Integers are accepted where floats are expected.
+    """
+    origin = typing.get_origin(expected)
+    if origin is typing.Union:
+        if value is None:
+            return None
+        inner, = (option for option in typing.get_args(expected) if option is not type(None))
+        return _check(name, value, inner)
+    if origin is list:
+        if not isinstance(value, list):
+            raise ValueError(f"Setting {name!r} must be a list")
+        item_type, = typing.get_args(expected)
+        return [_check(name, item, item_type) for item in value]
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if type(value) is not expected:
+        raise ValueError(f"Setting {name!r} must be of type {expected.__name__}, not {type(value).__name__}")
+    return value
+
+
+def load_config(path: str, base: Config) -> Config:
+    """
+    Read a config file over a base config
+    @param path: TOML file if it ends in .toml, JSON file otherwise
+    """
+    if path.endswith(".toml"):
+        with open(path, "rb") as file:
+            values = tomllib.load(file)
+    else:
+        with open(path) as file:
+            values = json.load(file)
+    if not isinstance(values, dict):
+        raise ValueError("Config file must contain a table of settings")
+    config = base.replace(values)
+    # Validate the servers now rather than when the snapshot is built
+    for checked in [config] + [server.config for server in config.virtual_servers()]:
+        if checked.server_protocol not in VERSIONS:
+            raise ValueError(f"Setting 'server_protocol' must be a protocol in versions.json, "
+                             f"not {checked.server_protocol}")
+    return config
+
+
+def _restart_changes(old: Config, new: Config) -> List[str]:
+    """
+    @return: Names of the changed settings that need a restart. Virtual servers can only change the
+    settings in RELOADABLE and their hosts; adding, removing or renaming servers needs a restart.
+    """
+    names = [field.name for field in dataclasses.fields(new) if field.name not in RELOADABLE
+             and getattr(new, field.name) != getattr(old, field.name)]
+    if new.servers != old.servers:
+        old_servers = {server.name: server.config for server in old.virtual_servers()}
+        new_servers = {server.name: server.config for server in new.virtual_servers()}
+        if old_servers.keys() != new_servers.keys():
+            names.append("servers")
+        else:
+            for name, server_config in new_servers.items():
+                names.extend(f"servers.{name}.{setting}"
+                             for setting in _restart_changes(old_servers[name], server_config))
+    return names
+
+
+class Snapshot(NamedTuple):
+    """
+    A config and everything derived from it. Handlers take one snapshot per connection and use only
+    that, so a reload never changes settings under a connection halfway through.
+    Virtual servers have a snapshot of their own, found by hostname through routes.
+    """
+    config: Config
+    status_cache: StatusCache
+    whitelist: Optional[Whitelist]
+    name: Optional[str]  # Virtual server name, None for the top level server
+    servers: Dict[str, "Snapshot"]
+    routes: HostRouter["Snapshot"]
+
+
+class LiveConfig:
+    """
+    Config reloaded from a file when it changes or on SIGHUP.
+
+    The file's mtime is checked at most every check_interval seconds. A reload builds a new
+    Snapshot and swaps it in with a single assignment, so readers never need a lock. The status
+    cache and whitelist are carried over unless their own settings changed, and the status cache is
+    keyed by MOTD and player counts, so each changed packet is built once, on first use. A missing
+    file means the settings from main.py. An invalid file fails at start-up, and on reload keeps the
+    current snapshot.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 5.0, base: Optional[Config] = None):
+        self.path = path
+        self.check_interval = check_interval
+        self.base = base if base is not None else Config.from_settings()
+        self._watch = FileWatch([path] if path is not None else [], check_interval)
+        mtimes = self._watch.check(force=True)
+        self._watch.commit(mtimes)
+        config = self.base
+        if mtimes and mtimes[0] is not None:
+            config = load_config(path, self.base)
+            logger.info("Loaded config from %s", path)
+        elif path is not None:
+            logger.info("No config file at %s, using the built-in settings", path)
+        self.current = self._snapshot(config, None)
+
+    @property
+    def config(self) -> Config:
+        return self.current.config
+
+    def _snapshot(self, config: Config, previous: Optional[Snapshot], name: Optional[str] = None) -> Snapshot:
+        old = previous.config if previous is not None else None
+        if old is not None and all(getattr(old, name) == getattr(config, name) for name in _STATUS_INPUTS):
+            status_cache = previous.status_cache
+        else:
+            status_cache = StatusCache(favicon=Favicon(config.favicon_file), fallback_protocol=config.server_protocol)
+        if old is not None and old.whitelist_files == config.whitelist_files:
+            whitelist = previous.whitelist
+        else:
+            whitelist = Whitelist(config.whitelist_files) if config.whitelist_files else None
+
+        servers: Dict[str, Snapshot] = {}
+        routes: HostRouter[Snapshot] = HostRouter()
+        for server in config.virtual_servers():
+            server_previous = previous.servers.get(server.name) if previous is not None else None
+            servers[server.name] = self._snapshot(server.config, server_previous, server.name)
+            for host in server.hosts:
+                routes.add(host, servers[server.name])
+        return Snapshot(config, status_cache, whitelist, name, servers, routes)
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload the config if the file has changed since it was last loaded
+        @param force: Reload even if check_interval has not passed yet or the mtime is the same
+        """
+        if self.path is None:
+            return
+        mtimes = self._watch.check(force, always=force)
+        if mtimes is None:
+            return
+        self._watch.commit(mtimes)
+
+        try:
+            config = load_config(self.path, self.base) if mtimes[0] is not None else self.base
+        except (OSError, ValueError) as e:
+            logger.warning("Keeping the current config, could not load %s: %s", self.path, e)
+            return
+        self._apply(config)
+
+    def _apply(self, config: Config) -> None:
+        previous = self.current
+        restart = _restart_changes(previous.config, config)
+        if restart:
+            logger.warning("Changes to %s only take effect after a restart", ", ".join(restart))
+        # Restart-only settings keep their running values, so the snapshot matches what is in effect
+        config = dataclasses.replace(config, **{name: getattr(previous.config, name) for name in restart
+                                                if not name.startswith("servers.")})
+        server_restart = [name for name in restart if name.startswith("servers.")]
+        if server_restart:
+            running = {server.name: server.config for server in previous.config.virtual_servers()}
+            servers = [dict(entry) for entry in config.servers]
+            for server, entry in zip(config.virtual_servers(), servers):
+                for name in server_restart:
+                    server_name, setting = name[len("servers."):].rsplit(".", 1)
+                    if server_name == server.name:
+                        entry[setting] = getattr(running[server_name], setting)
+            config = dataclasses.replace(config, servers=servers)
+        if config == previous.config:
+            return
+        self.current = self._snapshot(config, previous)
+        logger.info("Reloaded config from %s", self.path)
+
+    async def watch(self) -> None:
+        """
+        Reload on SIGHUP and when the file changes, until cancelled
+        """
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGHUP, self.refresh, True)
+        try:
+            while True:
+                await asyncio.sleep(self.check_interval)
+                self.refresh()
+        finally:
+            loop.remove_signal_handler(signal.SIGHUP)
@@ -0,0 +1,67 @@
+import base64
+import logging
+import struct
+from typing import Optional
+
+from filewatch import FileWatch
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ICON_SIZE = 64
+
+
+def encode_favicon(data: bytes) -> bytes:
+    """
+    Validate a PNG server icon and encode it as the data URI used in status responses
+    @param data: Contents of the PNG file
+    @return: The data URI, ASCII encoded
+    """
+    # The IHDR chunk always comes first: length, type, then width and height
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b"IHDR":
+        raise ValueError("Not a PNG file")
+    width, height = struct.unpack(">II", data[16:24])
+    if (width, height) != (ICON_SIZE, ICON_SIZE):
+        raise ValueError(f"Server icon must be {ICON_SIZE}x{ICON_SIZE} pixels, not {width}x{height}")
+    return b"data:image/png;base64," + base64.b64encode(data)
+
+
+class Favicon:
+    """
+    Server icon loaded from a PNG file and base64 encoded once.
+
+    The file's mtime is checked at most every check_interval seconds and the icon is re-encoded when
+    it changes, so the icon can be swapped without a restart. Every successful load bumps
+    generation, letting caches that embed the icon know they are stale. A missing or invalid
+    file keeps the previous icon.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.data: Optional[bytes] = None
+        self.generation = 0
+        self._watch = FileWatch([path], check_interval)
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload the icon if the file has changed since it was last loaded
+        @param force: Check the file even if check_interval has not passed yet
+        """
+        try:
+            mtimes = self._watch.check(force)
+            if mtimes is None:
+                return
+            # An invalid icon is not retried until the file changes again
+            self._watch.commit(mtimes)
+            if mtimes[0] is None:
+                logger.info("No server icon at %s", self.path)
+                return
+            with open(self.path, "rb") as file:
+                self.data = encode_favicon(file.read())
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring server icon %s: %s", self.path, e)
+            return
+        self.generation += 1
+        logger.info("Loaded server icon %s", self.path)
@@ -0,0 +1,54 @@
+import os
+import time
+from typing import List, Optional
+
+MTimes = List[Optional[float]]
+
+
+class FileWatch:
+    """
+    Throttled change detection for files that are reloaded while running, by their mtimes.
+
+    check() stats the files at most every check_interval seconds and reports their mtimes when they
+    differ from the ones last passed to commit(). Callers commit once a load has succeeded, or straight
+    away if a failed load should not be retried until the files change again.
+    """
+
+    def __init__(self, paths: List[str], check_interval: float):
+        self.paths = paths
+        self.check_interval = check_interval
+        self.mtimes: Optional[MTimes] = None  # None until the first commit, so the first check reports
+        self._next_check = 0.0
+
+    def stat(self) -> MTimes:
+        """
+        @return: The mtime of each file, None for missing files
+        """
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return mtimes
+
+    def check(self, force: bool = False, always: bool = False) -> Optional[MTimes]:
+        """
+        @param force: Check even if check_interval has not passed yet
+        @param always: Report the mtimes even if they have not changed
+        @return: The current mtimes if the files should be reloaded, None otherwise
+        """
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return None
+        self._next_check = now + self.check_interval
+        mtimes = self.stat()
+        if mtimes == self.mtimes and not always:
+            return None
+        return mtimes
+
+    def commit(self, mtimes: MTimes) -> None:
+        """
+        Record the mtimes the files were loaded at
+        """
+        self.mtimes = mtimes
@@ -0,0 +1,313 @@
+import asyncio
+import enum
+import logging
+import statistics
+import subprocess
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Callable, Deque, List, Optional
+
+import metrics
+from history import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+
+class State(enum.Enum):
+    """
+    Lifecycle of the real server behind the spoofer
+    """
+    HIBERNATING = "hibernating"
+    STARTING = "starting"
+    ONLINE = "online"
+    IDLE = "idle"
+    STOPPING = "stopping"
+
+
+class Backend:
+    """
+    Hook that starts and stops the real server. Both methods block and are run in a worker thread,
+    holding lock, so a start never overlaps a stop that is still running.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+
+class SubprocessBackend(Backend):
+    """
+    Run the real server as a local child process
+    """
+
+    def __init__(self, command: List[str], cwd: Optional[str] = None):
+        super().__init__()
+        self.command = command
+        self.cwd = cwd
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(self.command, cwd=self.cwd)
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+class HttpBackend(Backend):
+    """
+    Start and stop the real server by POSTing to an HTTP endpoint, e.g. a cloud function
+    """
+
+    def __init__(self, start_url: str, stop_url: Optional[str] = None, timeout: float = 30.0):
+        super().__init__()
+        self.start_url = start_url
+        self.stop_url = stop_url
+        self.timeout = timeout
+
+    def _post(self, url: str) -> None:
+        request = urllib.request.Request(url, data=b"", method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def start(self) -> None:
+        self._post(self.start_url)
+
+    def stop(self) -> None:
+        if self.stop_url is not None:
+            self._post(self.stop_url)
+
+
+class LocalState:
+    """
+    Hibernation state of a single process
+    """
+
+    def __init__(self):
+        self.state = State.HIBERNATING
+        self.active_sessions = 0
+        self.last_activity = 0.0
+
+    def compare_and_set(self, expected: State, new: State) -> bool:
+        """
+        Move to the new state only if the current state is the expected one
+        @return: Whether the state was changed
+        """
+        if self.state != expected:
+            return False
+        self.state = new
+        return True
+
+    def add_sessions(self, delta: int) -> None:
+        self.active_sessions += delta
+
+
+class Hibernator:
+    """
+    State machine HIBERNATING -> STARTING -> ONLINE -> IDLE -> STOPPING -> HIBERNATING around a Backend.
+
+    A wake-up starts the backend and polls its port until it accepts connections. While the
+    backend is ONLINE or IDLE, the listener splices new connections through to it. A join while
+    the backend is STOPPING wakes it again; the start waits for the stop to finish.
+
+    The state lives in a store, a LocalState by default. Worker processes share a
+    workers.SharedState instead and pass manages_backend=False: they only flip the state to
+    STARTING, and the coordinator process, running watch(), is the one that starts the backend.
+
+    With a history store, wake-ups, boot times and sessions are recorded in it, and the ETA
+    estimate uses the boot times it holds. They are re-read at most every history_refresh seconds,
+    which is how workers learn the boot times the coordinator records.
+    """
+
+    def __init__(self, backend: Backend, backend_host: str, backend_port: int, start_timeout: float = 300.0,
+                 poll_interval: float = 1.0, store=None, manages_backend: bool = True,
+                 history: Optional[HistoryStore] = None, history_refresh: float = 60.0):
+        self.backend = backend
+        self.backend_host = backend_host
+        self.backend_port = backend_port
+        self.start_timeout = start_timeout
+        self.poll_interval = poll_interval
+        self.store = store if store is not None else LocalState()
+        self.manages_backend = manages_backend
+        self.history = history
+        self.history_refresh = history_refresh
+        self.boot_times: Deque[float] = deque(maxlen=100)
+        self._boot_times_loaded = -history_refresh
+        self.started_at: Optional[float] = None
+        self._wake_task: Optional[asyncio.Task] = None
+
+    @property
+    def state(self) -> State:
+        return self.store.state
+
+    @property
+    def active_sessions(self) -> int:
+        return self.store.active_sessions
+
+    @property
+    def last_activity(self) -> float:
+        """
+        time.monotonic() when a proxied player session last started or ended
+        """
+        return self.store.last_activity
+
+    def _set_state(self, state: State) -> None:
+        logger.info("Backend state: %s -> %s", self.state.value, state.value)
+        self.store.state = state
+
+    def _transition(self, expected: State, new: State) -> bool:
+        if not self.store.compare_and_set(expected, new):
+            return False
+        logger.info("Backend state: %s -> %s", expected.value, new.value)
+        return True
+
+    @property
+    def is_up(self) -> bool:
+        """
+        Whether connections should be proxied to the backend
+        """
+        return self.state in (State.ONLINE, State.IDLE)
+
+    def wake(self, player: Optional[str] = None) -> None:
+        """
+        Start the backend if it is hibernating. Returns immediately; use wait_online() to wait for it.
+        @param player: Name of the player whose join triggered the wake-up, for the history
+        """
+        if self._transition(State.HIBERNATING, State.STARTING) or self._transition(State.STOPPING, State.STARTING):
+            self.started_at = time.monotonic()
+            metrics.WAKEUPS.inc()
+            if self.history is not None:
+                self.history.record_wakeup(player)
+            if self.manages_backend:
+                self._wake_task = asyncio.get_running_loop().create_task(self._start_backend())
+
+    async def watch(self, interval: float = 0.1) -> None:
+        """
+        Start the backend whenever another process has requested a wake-up. Runs forever.
+        """
+        while True:
+            if self.state == State.STARTING and (self._wake_task is None or self._wake_task.done()):
+                self._wake_task = asyncio.get_running_loop().create_task(self._start_backend())
+            await asyncio.sleep(interval)
+
+    def eta(self) -> Optional[float]:
+        """
+        Estimate how long until the backend is up, from the median of past boot times
+        @return: Seconds until the backend should be up, None if there is no history to go by
+        """
+        now = time.monotonic()
+        if self.history is not None and now - self._boot_times_loaded >= self.history_refresh:
+            self._boot_times_loaded = now
+            self.boot_times.clear()
+            self.boot_times.extend(self.history.boot_times(self.boot_times.maxlen))
+        if not self.boot_times:
+            return None
+        expected = statistics.median(self.boot_times)
+        if self.state == State.STARTING and self.started_at is not None:
+            return max(expected - (now - self.started_at), 0.0)
+        return expected
+
+    async def wait_online(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the backend is up
+        @return: Whether the backend came up within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_up:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def _backend_accepts(self) -> bool:
+        try:
+            _, writer = await asyncio.open_connection(self.backend_host, self.backend_port)
+        except OSError:
+            return False
+        writer.close()
+        return True
+
+    async def _start_backend(self) -> None:
+        started = self.started_at = time.monotonic()
+        try:
+            await asyncio.to_thread(self._run_backend, self.backend.start)
+            while time.monotonic() - started < self.start_timeout:
+                if await self._backend_accepts():
+                    self.boot_times.append(time.monotonic() - started)
+                    metrics.BACKEND_READY.observe(self.boot_times[-1])
+                    if self.history is not None:
+                        self.history.record_boot(self.boot_times[-1])
+                    self._set_state(State.ONLINE)
+                    return
+                await asyncio.sleep(self.poll_interval)
+            logger.error("Backend did not come up within %s seconds", self.start_timeout)
+        except Exception:
+            logger.exception("Starting backend failed")
+        await self.hibernate()
+
+    def mark_idle(self) -> None:
+        """
+        Record that the last player left the backend
+        """
+        self._transition(State.ONLINE, State.IDLE)
+
+    def mark_active(self) -> None:
+        """
+        Record that a player is on the backend again
+        """
+        self._transition(State.IDLE, State.ONLINE)
+
+    def _run_backend(self, action: Callable[[], None]) -> None:
+        with self.backend.lock:
+            action()
+
+    async def hibernate(self) -> None:
+        """
+        Stop the backend and go back to answering clients ourselves. Only once the stop has returned
+        is the state HIBERNATING, unless a join woke the backend again in the meantime.
+        """
+        self._set_state(State.STOPPING)
+        try:
+            await asyncio.to_thread(self._run_backend, self.backend.stop)
+        except Exception:
+            logger.exception("Stopping backend failed")
+        self._transition(State.STOPPING, State.HIBERNATING)
+
+    def session_started(self) -> None:
+        """
+        Record a player connection being proxied to the backend
+        """
+        self.store.add_sessions(1)
+        self.store.last_activity = time.monotonic()
+        self.mark_active()
+
+    def session_ended(self, address: str, seconds: float) -> None:
+        """
+        Record a proxied player connection closing
+        @param address: Client address
+        @param seconds: How long the session lasted
+        """
+        self.store.add_sessions(-1)
+        self.store.last_activity = time.monotonic()
+        if self.history is not None:
+            self.history.record_session(address, seconds)
+
+    def record_join_latency(self, seconds: float) -> None:
+        """
+        Record the time from a client's join packet to the first byte proxied back to it
+        """
+        metrics.JOIN_LATENCY.observe(seconds)
+        logger.debug("Join latency: %.1f ms", seconds * 1000)
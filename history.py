@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import sqlite3
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS joins (
+    timestamp REAL NOT NULL,
+    address TEXT NOT NULL,
+    name TEXT NOT NULL,
+    uuid TEXT,
+    allowed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS joins_timestamp ON joins (timestamp);
+CREATE INDEX IF NOT EXISTS joins_name ON joins (name, timestamp);
+
+CREATE TABLE IF NOT EXISTS wakeups (
+    timestamp REAL NOT NULL,
+    player TEXT
+);
+CREATE INDEX IF NOT EXISTS wakeups_timestamp ON wakeups (timestamp);
+
+CREATE TABLE IF NOT EXISTS boots (
+    timestamp REAL NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS boots_timestamp ON boots (timestamp);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    timestamp REAL NOT NULL,
+    address TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_timestamp ON sessions (timestamp);
+
+-- Allowed joins per hour since the epoch, kept up to date on every flush so hourly aggregates
+-- read at most one row per hour instead of scanning every join
+CREATE TABLE IF NOT EXISTS join_hours (
+    hour INTEGER PRIMARY KEY,
+    joins INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+_INSERTS = {
+    "joins": "INSERT INTO joins VALUES (?, ?, ?, ?, ?)",
+    "wakeups": "INSERT INTO wakeups VALUES (?, ?)",
+    "boots": "INSERT INTO boots VALUES (?, ?)",
+    "sessions": "INSERT INTO sessions VALUES (?, ?, ?)",
+}
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+
+class HistoryStore:
+    """
+    Append-only record of joins, wake-ups, boot times and sessions in an SQLite database.
+
+    The record_* methods only append to an in-memory batch, so they are safe to call on the accept
+    path. run() writes the batch in a single transaction from a worker thread every flush_interval
+    seconds. The database is in WAL mode, so queries and other processes' writes do not block on a
+    flush; queries use their own connection.
+
+    Timestamps are wall clock seconds since the epoch.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[str, tuple]] = []
+        self._writer = self._connect()
+        self._writer.executescript(SCHEMA)
+        self._reader = self._connect()
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record_join(self, address: str, name: str, uuid: Optional[str], allowed: bool = True) -> None:
+        self._pending.append(("joins", (time.time(), address, name, uuid, int(allowed))))
+
+    def record_wakeup(self, player: Optional[str] = None) -> None:
+        self._pending.append(("wakeups", (time.time(), player)))
+
+    def record_boot(self, seconds: float) -> None:
+        self._pending.append(("boots", (time.time(), seconds)))
+
+    def record_session(self, address: str, seconds: float) -> None:
+        """
+        Record a proxied session that has just ended, stored under the time it started
+        """
+        self._pending.append(("sessions", (time.time() - seconds, address, seconds)))
+
+    def _write(self, batch: List[Tuple[str, tuple]]) -> None:
+        rows: Dict[str, List[tuple]] = {}
+        hours: Dict[int, int] = {}
+        for table, row in batch:
+            rows.setdefault(table, []).append(row)
+            if table == "joins" and row[4]:
+                hour = int(row[0] // HOUR)
+                hours[hour] = hours.get(hour, 0) + 1
+        with self._write_lock:
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                for table, table_rows in rows.items():
+                    self._writer.executemany(_INSERTS[table], table_rows)
+                self._writer.executemany("INSERT INTO join_hours VALUES (?, ?) ON CONFLICT (hour) "
+                                         "DO UPDATE SET joins = joins + excluded.joins", hours.items())
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    def flush(self) -> None:
+        """
+        Write everything recorded so far, blocking until it is committed
+        """
+        batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    async def run(self) -> None:
+        """
+        Flush the batch every flush_interval seconds until cancelled, then flush what is left
+        """
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                batch, self._pending = self._pending, []
+                if batch:
+                    try:
+                        await asyncio.to_thread(self._write, batch)
+                    except sqlite3.Error:
+                        logger.exception("Could not write %d history records", len(batch))
+        finally:
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+        self._reader.close()
+
+    def _query(self, sql: str, parameters: tuple = ()) -> List[tuple]:
+        with self._read_lock:
+            return self._reader.execute(sql, parameters).fetchall()
+
+    def boot_times(self, limit: int = 100) -> List[float]:
+        """
+        @return: The most recent boot durations in seconds, oldest first
+        """
+        rows = self._query("SELECT seconds FROM boots ORDER BY timestamp DESC LIMIT ?", (limit,))
+        return [seconds for seconds, in reversed(rows)]
+
+    def median_boot_time(self, since: float) -> Optional[float]:
+        """
+        @param since: Only consider boots after this timestamp
+        @return: Median seconds from wake-up to the backend accepting connections, None without any boots
+        """
+        rows = self._query("SELECT seconds FROM boots WHERE timestamp >= ?", (since,))
+        if not rows:
+            return None
+        return statistics.median(seconds for seconds, in rows)
+
+    def hourly_joins(self, since: float) -> List[Tuple[int, int]]:
+        """
+        @return: (hour since the epoch, number of allowed joins) for every hour with any after since, oldest first
+        """
+        return self._query("SELECT hour, joins FROM join_hours WHERE hour >= ? ORDER BY hour", (int(since // HOUR),))
+
+    def first_join_hour(self) -> Optional[int]:
+        """
+        @return: Hour since the epoch of the first recorded allowed join, None if there is none
+        """
+        return self._query("SELECT MIN(hour) FROM join_hours")[0][0]
+
+    def join_times(self, since: float = 0.0) -> List[float]:
+        """
+        @return: Timestamps of all allowed joins after since, oldest first
+        """
+        rows = self._query("SELECT timestamp FROM joins WHERE timestamp >= ? AND allowed ORDER BY timestamp", (since,))
+        return [timestamp for timestamp, in rows]
+
+    def busiest_hours(self, since: float, count: int = 5) -> List[Tuple[int, int]]:
+        """
+        @return: The count hours of the day (0-23, UTC) with the most allowed joins after since, with their counts
+        """
+        return self._query("SELECT hour % 24 AS hour_of_day, SUM(joins) AS total FROM join_hours WHERE hour >= ? "
+                           "GROUP BY hour_of_day ORDER BY total DESC LIMIT ?", (int(since // HOUR), count))
+
+    def player_joins(self, name: str, since: float = 0.0) -> List[Tuple[float, str, bool]]:
+        """
+        @return: (timestamp, address, allowed) of every join by this player after since, oldest first
+        """
+        rows = self._query("SELECT timestamp, address, allowed FROM joins WHERE name = ? AND timestamp >= ? "
+                           "ORDER BY timestamp", (name, since))
+        return [(timestamp, address, bool(allowed)) for timestamp, address, allowed in rows]
+
+    def median_session_time(self, since: float) -> Optional[float]:
+        """
+        @return: Median length in seconds of sessions started after since, None without any sessions
+        """
+        rows = self._query("SELECT seconds FROM sessions WHERE timestamp >= ?", (since,))
+        if not rows:
+            return None
+        return statistics.median(seconds for seconds, in rows)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+import socket
+import time
+from typing import Awaitable, Callable, Optional
+
+from hibernation import Hibernator, State
+from main import encode_string, encode_var_int, read_string, read_var_int, send_packet
+
+logger = logging.getLogger(__name__)
+
+
+class StatusPoller:
+    """
+    Ask the backend how many players are online, speaking the client side of the status protocol.
+
+    The connection is kept and reused for the next poll while the backend allows it. Vanilla servers
+    close it after one status exchange; once a reuse attempt fails the poller stops trying and opens
+    a fresh connection per poll instead.
+    """
+
+    def __init__(self, host: str, port: int, protocol: int, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.timeout = timeout
+        self.reuse = True
+        self.sock: Optional[socket.socket] = None
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        handshake = encode_var_int(self.protocol) + encode_string(self.host) \
+            + bytearray(self.port.to_bytes(2, byteorder="big")) + encode_var_int(1)
+        send_packet(0, handshake, sock)
+        return sock
+
+    def _request(self, sock: socket.socket) -> int:
+        send_packet(0, bytearray(), sock)
+        read_var_int(sock)  # Length
+        packet_id, _ = read_var_int(sock)
+        if packet_id != 0:
+            raise ConnectionError(f"Expected a status response, got packet {packet_id}")
+        status, _ = read_string(sock)
+        return int(json.loads(status)["players"]["online"])
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def players_online(self) -> int:
+        """
+        Blocking status query
+        @return: Number of players the backend reports
+        """
+        if self.sock is not None:
+            try:
+                return self._request(self.sock)
+            except (OSError, ValueError):
+                self.close()
+                self.reuse = False
+
+        sock = self._connect()
+        try:
+            online = self._request(sock)
+        except BaseException:
+            sock.close()
+            raise
+        if self.reuse:
+            self.sock = sock
+        else:
+            sock.close()
+        return online
+
+
+class IdleScheduler:
+    """
+    Shut the backend down after it has had no players for idle_timeout seconds.
+
+    Players are counted both from sessions proxied by us and from the backend's own status, so
+    players connected some other way keep it up as well. Sessions that start and end between two
+    polls still count: idle time runs from the later of the first empty poll and the last session
+    starting or ending. While nobody is online the poll interval
+    doubles up to max_poll_interval, without overshooting the shutdown deadline. hold() keeps the
+    backend up for a while even without players, e.g. while a pre-warmed backend waits for them.
+    """
+
+    def __init__(self, hibernator: Hibernator, poller: StatusPoller, idle_timeout: float = 600.0,
+                 poll_interval: float = 30.0, max_poll_interval: float = 300.0,
+                 shutdown_hook: Optional[Callable[[], Awaitable[None]]] = None):
+        self.hibernator = hibernator
+        self.poller = poller
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.shutdown_hook = shutdown_hook if shutdown_hook is not None else hibernator.hibernate
+        self.idle_since: Optional[float] = None
+        self.held_until = 0.0
+        self._interval = poll_interval
+
+    def hold(self, seconds: float) -> None:
+        """
+        Do not start counting idle time for the next seconds seconds
+        """
+        self.held_until = max(self.held_until, time.monotonic() + seconds)
+
+    async def _players(self) -> int:
+        try:
+            online = await asyncio.to_thread(self.poller.players_online)
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug("Backend status poll failed: %r", e)
+            online = 0
+        return max(online, self.hibernator.active_sessions)
+
+    async def check(self) -> float:
+        """
+        Poll once and shut down if the backend has been idle for long enough
+        @return: Seconds to wait before the next check
+        """
+        if not self.hibernator.is_up:
+            self.idle_since = None
+            self._interval = self.poll_interval
+            self.poller.close()
+            return self.poll_interval
+
+        if await self._players() > 0:
+            self.idle_since = None
+            self._interval = self.poll_interval
+            self.hibernator.mark_active()
+            return self.poll_interval
+
+        now = time.monotonic()
+        if now < self.held_until:
+            self.idle_since = None
+            return max(min(self.poll_interval, self.held_until - now), 1.0)
+        if self.idle_since is not None and self.hibernator.state == State.ONLINE:
+            # A player joined since the last poll and has already left again
+            self.idle_since = None
+            self._interval = self.poll_interval
+        if self.idle_since is None:
+            self.idle_since = now
+            self.hibernator.mark_idle()
+        idle_for = now - max(self.idle_since, self.hibernator.last_activity)
+        if idle_for >= self.idle_timeout:
+            logger.info("No players for %.0f seconds, shutting the backend down", idle_for)
+            self.idle_since = None
+            self._interval = self.poll_interval
+            self.poller.close()
+            await self.shutdown_hook()
+            return self.poll_interval
+
+        interval = self._interval
+        self._interval = min(self._interval * 2, self.max_poll_interval)
+        return max(min(interval, self.idle_timeout - idle_for), 1.0)
+
+    async def run(self) -> None:
+        """
+        Check forever
+        """
+        while True:
+            await asyncio.sleep(await self.check())
@@ -0,0 +1,55 @@
+import logging
+from typing import Optional, Tuple
+
+from packet_reader import PacketBuffer
+
+logger = logging.getLogger(__name__)
+
+# Protocol versions where the Login Start packet changed layout
+PROTOCOL_1_19 = 759  # Adds optional signature data
+PROTOCOL_1_19_1 = 760  # Adds an optional UUID after the signature data
+PROTOCOL_1_19_3 = 761  # Drops the signature data
+PROTOCOL_1_20_2 = 764  # UUID is always present
+
+
+def read_login_start(packet: PacketBuffer, protocol: int) -> Tuple[str, Optional[str]]:
+    """
+    Read the contents of a Login Start packet, positioned after its packet id
+    @param packet:
+    @param protocol: Protocol version from the client's handshake
+    @return: The player name, and the UUID if the client's version sends one
+    """
+    name, _ = packet.read_string()
+    if protocol < PROTOCOL_1_19:
+        return name, None
+    if protocol >= PROTOCOL_1_20_2:
+        return name, packet.read_uuid()[0]
+
+    if protocol < PROTOCOL_1_19_3:
+        has_signature, _ = packet.read_bool()
+        if has_signature:
+            packet.read_long()  # Key expiry
+            packet.read_byte_array()  # Public key
+            packet.read_byte_array()  # Signature
+        if protocol < PROTOCOL_1_19_1:
+            return name, None
+    has_uuid, _ = packet.read_bool()
+    return name, packet.read_uuid()[0] if has_uuid else None
+
+
+def record_login(address: str, name: str, uuid: Optional[str]) -> None:
+    """
+    Log who tried to join, for auditing wake-ups. The history store keeps them, when one is configured.
+    """
+    logger.info("Join attempt by %s (%s) from %s", name, uuid or "no uuid", address)
+
+
+def format_eta(seconds: float) -> str:
+    """
+    Round a number of seconds up to a coarse, readable duration. The coarse steps also keep the
+    number of distinct Disconnect messages, and so cached packets, small.
+    """
+    if seconds <= 60:
+        return f"{max(10, -(-int(seconds) // 10) * 10)} seconds"
+    minutes = -(-int(seconds) // 60)
+    return f"{minutes} minutes"
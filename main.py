@@ -1,34 +1,95 @@
+import functools
+import json
+import logging
 import socket
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+
+import varint
+from favicon import Favicon
+from packet_reader import PacketReader
+from versions import VERSIONS, Version
+
+logger = logging.getLogger(__name__)
 
 # START Settings
+# Defaults for the settings in CONFIG_FILE, which overrides them by their lowercase names (see config.py)
+
+CONFIG_FILE: Optional[str] = "hibernate.toml"
+CONFIG_CHECK_INTERVAL = 5.0  # Seconds between checks of the config file for changes
 
 DEBUG = True
 LISTEN_HOST = "0.0.0.0"
 LISTEN_PORT = 25565
+LISTEN_BACKLOG = 1024
+READ_TIMEOUT = 5.0  # Seconds a client may take to send everything before it is answered or proxied
+
+SERVER_PROTOCOL = 751  # Version reported to clients on versions missing from versions.json
+MAX_PLAYERS = 20
+MOTD = "Server is hibernating, join to wake it up"
+MOTD_STARTING = "Server is starting, please wait"
+FAVICON_FILE = "server-icon.png"  # 64x64 PNG, reloaded when it changes
+START_MESSAGE = "The server is starting, please try again in a minute"
+START_MESSAGE_ETA = "The server is starting, please try again in {eta}"  # Used once boot times are known
+NOT_WHITELISTED_MESSAGE = "You are not whitelisted on this server"
+
+# Only players in these files (vanilla whitelist.json format) can wake the backend. Empty lets anyone wake it.
+WHITELIST_FILES: List[str] = []
+
+# Real server to wake up on join. Set either a command to run or an HTTP endpoint to POST to.
+BACKEND_HOST = "127.0.0.1"
+BACKEND_PORT = 25566
+BACKEND_START_COMMAND: Optional[List[str]] = None
+BACKEND_START_URL: Optional[str] = None
+BACKEND_STOP_URL: Optional[str] = None
+BACKEND_START_TIMEOUT = 300.0
+IDLE_TIMEOUT = 600.0  # Seconds without players before the backend is shut down
+IDLE_POLL_INTERVAL = 30.0
+IDLE_MAX_POLL_INTERVAL = 300.0
+
+# Admission control, applied before a connection is parsed
+RATE_LIMIT_PER_SECOND = 2.0  # Connections per second refilled for each source address
+RATE_LIMIT_BURST = 10.0
+RATE_LIMIT_TRACKED_CLIENTS = 65536  # Addresses remembered, least recently seen are forgotten first
+MAX_CONNECTIONS = 1000  # Connections served at the same time
+
+# Joins, wake-ups, boot times and sessions are kept in this SQLite database, None to keep no history
+HISTORY_FILE: Optional[str] = "history.sqlite3"
+HISTORY_FLUSH_INTERVAL = 1.0
+
+# Start the backend ahead of hours in which someone joined in at least PREWARM_THRESHOLD of the last PREWARM_WEEKS
+# weeks, and hibernate it again if nobody joined PREWARM_GRACE seconds into the hour. Needs the history.
+# PREWARM_LEAD_TIME None starts the median boot time ahead. PREWARM_THRESHOLD None disables pre-warming.
+PREWARM_THRESHOLD: Optional[float] = None
+PREWARM_WEEKS = 8
+PREWARM_MIN_WEEKS = 2  # Weeks of history needed before an hour can be pre-warmed
+PREWARM_LEAD_TIME: Optional[float] = None
+PREWARM_GRACE = 3600.0
+
+# Prometheus text endpoint on METRICS_HOST:METRICS_PORT, and/or a file rewritten every METRICS_DUMP_INTERVAL
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT: Optional[int] = 9565
+METRICS_DUMP_FILE: Optional[str] = None
+METRICS_DUMP_INTERVAL = 60.0
+
+# Virtual servers sharing the listener, routed by the hostname clients connect to. Each is a dict with "hosts",
+# an optional "name" and the settings that differ from the ones above, in lowercase. For example:
+# {"hosts": ["survival.example.com"], "motd": "Survival", "backend_port": 25570, "backend_start_command": [...]}
+SERVERS: List[dict] = []
 
 
 # END Settings
 
-def dprint(*args, **kwargs):
-    """
-    Print a debug message when DEBUG = True
-    """
-    if DEBUG:
-        print(*args, **kwargs)
-
-
-def rshift(value: int, n: int) -> int:
+def recv_exactly(sock: socket.socket, length: int) -> bytes:
     """
-    Move the bits of a value n positions to the right, including the sign bit
-    @param value: Value to move
-    @param n: Number of positions to move
-    @return: Value with its bits moved n positions to the right
+    Receive exactly length bytes from a socket, even if the kernel hands them over in pieces
     """
-    if value >= 0:
-        return value >> n
-    else:
-        return (value + (1 << 32)) >> n
+    data = bytearray()
+    while len(data) < length:
+        read = sock.recv(length - len(data))
+        if not read:
+            raise ConnectionError(f"Connection closed after {len(data)} of {length} bytes")
+        data += read
+    return bytes(data)
 
 
 def read_var_int(sock: socket.socket) -> Tuple[int, int]:
@@ -37,14 +98,14 @@ def read_var_int(sock: socket.socket) -> Tuple[int, int]:
     """
     result = 0
     for bytes_read in range(5):
-        read = ord(sock.recv(1))
+        read = recv_exactly(sock, 1)[0]
         value = read & 0b01111111
         result |= (value << (7 * bytes_read))
 
         if read & 0b10000000 == 0:
             return result, bytes_read + 1
 
-    raise Exception("More than 5 bytes in VarInt")
+    raise varint.MalformedPacket("More than 5 bytes in VarInt")
 
 
 def read_string(sock: socket.socket) -> Tuple[str, int]:
@@ -52,7 +113,7 @@ def read_string(sock: socket.socket) -> Tuple[str, int]:
     Read a string from a socket stream
     """
     length, num_read = read_var_int(sock)
-    read = sock.recv(length)
+    read = recv_exactly(sock, length)
     result = read.decode("utf-8")
     return result, num_read + length
 
@@ -63,8 +124,8 @@ def read_unsigned_short(sock: socket.socket) -> Tuple[int, int]:
     @param sock:
     @return:
     """
-    read = sock.recv(2)
-    value = int.from_bytes(read, byteorder='big', signed=True)
+    read = recv_exactly(sock, 2)
+    value = int.from_bytes(read, byteorder='big', signed=False)
     return value, 2
 
 
@@ -74,7 +135,7 @@ def read_long(sock: socket.socket) -> Tuple[int, int]:
     @param sock:
     @return:
     """
-    read = sock.recv(8)
+    read = recv_exactly(sock, 8)
     value = int.from_bytes(read, byteorder='big', signed=True)
     return value, 8
 
@@ -85,25 +146,17 @@ def encode_long(value: int) -> bytearray:
     @param value:
     @return:
     """
-    value_enc = value.to_bytes(8, byteorder='big')
+    value_enc = value.to_bytes(8, byteorder='big', signed=True)
     return bytearray(value_enc)
 
 
-def encode_var_int(value: int) -> bytearray:
+def encode_var_int(value: int) -> bytes:
     """
     Encode a Python integer as an MC VarInt type
     @param value:
     @return:
     """
-    result = bytearray(0)
-    for i in range(100):
-        temp = value & 0b01111111
-        value = rshift(value, 7)
-        if value != 0:
-            temp |= 0b10000000
-        result.append(temp)
-        if value == 0:
-            return result
+    return varint.encode_var_int(value)
 
 
 def encode_string(text: str) -> bytearray:
@@ -156,72 +209,182 @@ def handle_client_socket(client_socket: socket.socket, client_address: Tuple[str
     :param client_socket:
     :param client_address:
     """
-    print(f"Received a packet from {client_address[0]}:{client_address[1]}")
+    logger.debug("Received a packet from %s:%d", client_address[0], client_address[1])
+    reader = PacketReader(client_socket)
 
-    # Read length and packet_id (present on any packet)
-    length = read_var_int(client_socket)
-    print(f"Length: {length}")
-    packet_id = read_var_int(client_socket)
-    print(f"Packet ID: {packet_id}")
+    reader.fill()
+    if reader.buffered()[:1] == b"\xfe":
+        # Legacy (pre-1.7) server list ping
+        client_socket.sendall(build_legacy_kick(MOTD, 0, MAX_PLAYERS))
+        close_connection(client_socket)
+        return
+
+    # Read packet_id (present on any packet)
+    packet = reader.read_frame()
+    logger.debug("Length: %d", len(packet.data))
+    packet_id = packet.read_var_int()
+    logger.debug("Packet ID: %s", packet_id)
 
     if packet_id[0] == 0:
         # Assuming it's a handshake, read fields
-        protocol_version = read_var_int(client_socket)
-        print(f"Protocol version: {protocol_version}")
-        server_address = read_string(client_socket)
-        print(f"Server address: {server_address}")
-        server_port = read_unsigned_short(client_socket)
-        print(f"Server port: {server_port}")
-        next_state = read_var_int(client_socket)
-        print(f"Next state: {next_state}")
-        print("=====")
+        protocol_version = packet.read_var_int()
+        logger.debug("Protocol version: %s", protocol_version)
+        server_address = packet.read_string()
+        logger.debug("Server address: %s", server_address)
+        server_port = packet.read_unsigned_short()
+        logger.debug("Server port: %s", server_port)
+        next_state = packet.read_var_int()
+        logger.debug("Next state: %s", next_state)
+        logger.debug("=====")
 
         # Request packet should follow (length 1 packet id 0 no other info)
-        length = read_var_int(client_socket)
-        print(f"Length: {length}")
-        packet_id = read_var_int(client_socket)
-        print(f"Packet ID: {packet_id}")
-        print("=====")
+        packet = reader.read_frame()
+        logger.debug("Length: %d", len(packet.data))
+        packet_id = packet.read_var_int()
+        logger.debug("Packet ID: %s", packet_id)
+        logger.debug("=====")
 
         # Reply with the server status
-        send_server_status(client_socket, client_address)
+        send_server_status(client_socket, client_address, protocol_version[0])
 
         # Expect a ping request
-        length = read_var_int(client_socket)
-        print(f"Length: {length}")
-        packet_id = read_var_int(client_socket)
-        print(f"Packet ID: {packet_id}")
-        payload = read_long(client_socket)
-        print(f"payload: {payload}")
-        print("=====")
+        packet = reader.read_frame()
+        logger.debug("Length: %d", len(packet.data))
+        packet_id = packet.read_var_int()
+        logger.debug("Packet ID: %s", packet_id)
+        payload = packet.read_long()
+        logger.debug("payload: %s", payload)
+        logger.debug("=====")
 
         # Reply with a pong
         send_pong(client_socket, payload[0])
 
     else:
         # Unknown packet
-        first_int = read_var_int(client_socket)
-        print(f"First int: ", first_int)
+        first_int = packet.read_var_int()
+        logger.debug("First int: %s", first_int)
 
     # Close the connection
     close_connection(client_socket)
 
 
-def send_server_status(client_socket: socket.socket, client_address: Tuple[str, int]) -> None:
+def build_server_status(version: Version, motd: str, online: int, max_players: int,
+                        favicon: Optional[bytes] = None) -> bytes:
+    """
+    Build a framed server status packet
+    @param version: Version reported to the client, also determines the packet id
+    @param motd: Text shown in the server list
+    @param online: Number of players online
+    @param max_players: Maximum number of players
+    @param favicon: Encoded server icon data URI, spliced into the JSON as is
+    @return: The status response packet, ready to be sent
+    """
+    message = json.dumps({
+        "version": {"name": version.name, "protocol": version.protocol},
+        "players": {"max": max_players, "online": online},
+        "description": {"text": motd},
+    }, separators=(",", ":")).encode("utf-8")
+    if favicon is not None:
+        message = message[:-1] + b',"favicon":"' + favicon + b'"}'
+    message_enc = encode_var_int(len(message)) + message
+    return bytes(encode_packet(version.status_response, message_enc))
+
+
+class StatusCache:
+    """
+    Fully framed status response packets, built once for every distinct set of inputs.
+    A packet is only rebuilt when its protocol version, MOTD or player counts change, or when
+    the server icon has been reloaded.
+    Clients on a version from the version table get their own version echoed back; all
+    other clients share the packet for fallback_protocol.
+    """
+
+    def __init__(self, max_entries: int = 64, favicon: Optional[Favicon] = None,
+                 fallback_protocol: int = SERVER_PROTOCOL):
+        self.max_entries = max_entries
+        self.favicon = favicon
+        self.fallback_protocol = fallback_protocol
+        self._favicon_generation = 0
+        self._packets: Dict[Tuple[int, str, int, int], bytes] = {}
+
+    def get(self, protocol: int = SERVER_PROTOCOL, motd: str = MOTD, online: int = 0,
+            max_players: int = MAX_PLAYERS) -> bytes:
+        """
+        Get the status packet for these inputs, building it on first use
+        """
+        if self.favicon is not None:
+            self.favicon.refresh()
+            if self.favicon.generation != self._favicon_generation:
+                self._favicon_generation = self.favicon.generation
+                self._packets.clear()
+
+        key = (protocol, motd, online, max_players)
+        packet = self._packets.get(key)
+        if packet is None:
+            if len(self._packets) >= self.max_entries:
+                # Inputs have moved on (e.g. a fluctuating player count), old packets are stale
+                self._packets.clear()
+            version = VERSIONS.compatible(protocol, self.fallback_protocol)
+            key = (version.protocol, motd, online, max_players)
+            packet = self._packets.get(key)
+            if packet is None:
+                favicon = self.favicon.data if self.favicon is not None else None
+                packet = build_server_status(version, motd, online, max_players, favicon)
+                self._packets[key] = packet
+        return packet
+
+    def invalidate(self) -> None:
+        """
+        Drop all cached packets, e.g. after changing settings that are not part of the key
+        """
+        self._packets.clear()
+
+
+@functools.lru_cache(maxsize=1)
+def serial_status_cache() -> StatusCache:
+    """
+    @return: Status cache of the serial listener, built on first use so importing this module does not load the icon
+    """
+    return StatusCache(favicon=Favicon(FAVICON_FILE))
+
+
+def send_server_status(client_socket: socket.socket, client_address: Tuple[str, int],
+                       protocol: int = SERVER_PROTOCOL) -> None:
     """
     Send a server status packet
     @param client_socket:
     @param client_address:
+    @param protocol: Protocol version the client sent in its handshake
+    """
+    client_socket.sendall(serial_status_cache().get(protocol))
+
+
+@functools.lru_cache(maxsize=16)
+def build_disconnect(message: str, packet_id: int = 0) -> bytes:
+    """
+    Build a framed login Disconnect packet
+    @param message: Plain text reason shown to the player
+    @param packet_id: Id of the Disconnect packet in the client's protocol version
+    @return: The disconnect packet, ready to be sent
     """
-    message = '{' \
-              '"version":{"name":"1.16.2","protocol":751},' \
-              '"players":{"max":20,"online":1,"sample":[' \
-              '{"name":"notch","id": "00000000-0000-0000-0000-000000000000"}' \
-              ']},' \
-              '"description":{"text":"Hello world"}' \
-              '}'
-    message_enc = encode_string(message)
-    send_packet(0, message_enc, client_socket)
+    message_enc = encode_string(json.dumps({"text": message}))
+    return bytes(encode_packet(packet_id, message_enc))
+
+
+@functools.lru_cache(maxsize=16)
+def build_legacy_kick(motd: str, online: int, max_players: int, protocol: int = SERVER_PROTOCOL) -> bytes:
+    """
+    Build the response to a pre-1.7 server list ping (0xFE 0x01): a kick packet (0xFF) with the
+    length in UTF-16 code units and fields separated by NUL characters.
+    Protocol 127 makes legacy clients show the version name in red instead of trying to join.
+    @param protocol: Protocol whose version name is shown
+    @return: The kick packet, ready to be sent
+    """
+    version = VERSIONS.get(protocol)
+    fields = ["\u00a71", "127", version.name, motd.replace("\x00", ""), str(online), str(max_players)]
+    message = "\x00".join(fields)
+    message_enc = message.encode("utf-16-be")
+    return b"\xff" + (len(message_enc) // 2).to_bytes(2, byteorder="big") + message_enc
 
 
 def send_pong(client_socket: socket.socket, payload: int) -> None:
@@ -244,25 +407,201 @@ def close_connection(client_socket: socket.socket) -> None:
     client_socket.close()
 
 
+def create_hibernator(config, store=None, manages_backend: bool = True):
+    """
+    Create the hibernation state machine for the configured backend
+    @param config: config.Config with the backend settings
+    @return: The Hibernator, or None if no backend is configured and we only spoof the status
+    """
+    from hibernation import Hibernator, HttpBackend, SubprocessBackend
+    from history import HistoryStore
+
+    if config.backend_start_command is not None:
+        backend = SubprocessBackend(config.backend_start_command)
+    elif config.backend_start_url is not None:
+        backend = HttpBackend(config.backend_start_url, config.backend_stop_url)
+    else:
+        return None
+    history = None
+    if config.history_file is not None:
+        history = HistoryStore(config.history_file, config.history_flush_interval)
+    return Hibernator(backend, config.backend_host, config.backend_port, config.backend_start_timeout, store=store,
+                      manages_backend=manages_backend, history=history)
+
+
+def create_server_hibernators(config, stores: Optional[Dict[str, object]] = None, manages_backend: bool = True):
+    """
+    Create the hibernation state machines of the virtual servers
+    @param config: config.Config listing the servers
+    @param stores: State store for each server by name, as for create_hibernator
+    @return: The Hibernators by server name, for the servers that have a backend configured
+    """
+    hibernators = {}
+    for server in config.virtual_servers():
+        store = stores.get(server.name) if stores is not None else None
+        hibernator = create_hibernator(server.config, store, manages_backend)
+        if hibernator is not None:
+            hibernators[server.name] = hibernator
+    return hibernators
+
+
+async def run(live_config, hibernator, listen: bool = True, coordinate: bool = True, reuse_port: bool = False,
+              worker: Optional[int] = None, server_hibernators: Optional[Dict[str, object]] = None) -> None:
+    """
+    Run the services of one process until cancelled
+    @param live_config: config.LiveConfig, reloaded on SIGHUP and when its file changes while listening
+    @param hibernator: State of the real server, None to only spoof the status
+    @param server_hibernators: State of each virtual server's backend by name, see create_server_hibernators
+    @param listen: Accept client connections
+    @param coordinate: Start the backend when a wake-up is requested and shut it down when idle
+    @param reuse_port: Share the listening port with other processes
+    @param worker: Index of this worker process, which serves its metrics on METRICS_PORT + 1 + index
+    """
+    import asyncio
+    from admission import AdmissionControl
+    from async_server import serve
+    from idle import IdleScheduler, StatusPoller
+    from metrics import dump_metrics, serve_metrics
+    from prewarm import PrewarmScheduler
+
+    config = live_config.config
+    tasks = []
+    if listen:
+        admission = AdmissionControl(config.rate_limit_per_second, config.rate_limit_burst,
+                                     config.rate_limit_tracked_clients, config.max_connections)
+        tasks.append(serve(config.listen_host, config.listen_port, backlog=config.listen_backlog,
+                           hibernator=hibernator, admission=admission, reuse_port=reuse_port, config=live_config,
+                           hibernators=server_hibernators))
+        tasks.append(live_config.watch())
+
+    # Every backend, the top level one and the virtual servers', with the settings it was created from
+    backends = [(hibernator, config)] if hibernator is not None else []
+    if server_hibernators:
+        backends.extend((server_hibernators[server.name], server.config) for server in config.virtual_servers()
+                        if server.name in server_hibernators)
+    for backend, backend_config in backends:
+        if coordinate:
+            poller = StatusPoller(backend_config.backend_host, backend_config.backend_port,
+                                  backend_config.server_protocol)
+            scheduler = IdleScheduler(backend, poller, backend_config.idle_timeout, backend_config.idle_poll_interval,
+                                      backend_config.idle_max_poll_interval)
+            tasks.append(scheduler.run())
+            if backend.history is not None and backend_config.prewarm_threshold is not None:
+                prewarm = PrewarmScheduler(backend, backend.history, scheduler, backend_config.prewarm_threshold,
+                                           backend_config.prewarm_weeks, backend_config.prewarm_min_weeks,
+                                           backend_config.prewarm_lead_time, backend_config.prewarm_grace)
+                tasks.append(prewarm.run())
+            if not listen:
+                tasks.append(backend.watch())
+        if backend.history is not None:
+            tasks.append(backend.history.run())
+    metrics_port, metrics_file = config.metrics_port, config.metrics_dump_file
+    if worker is not None:
+        metrics_port = None if metrics_port is None else metrics_port + 1 + worker
+        metrics_file = None if metrics_file is None else f"{metrics_file}.{worker}"
+    if metrics_port is not None:
+        tasks.append(serve_metrics(config.metrics_host, metrics_port))
+    if metrics_file is not None:
+        tasks.append(dump_metrics(metrics_file, config.metrics_dump_interval))
+    await asyncio.gather(*tasks)
+
+
+def run_workers(count: int, live_config) -> None:
+    """
+    Fork count worker processes sharing the listening port with SO_REUSEPORT.
+    The parent process coordinates: it owns the backend, starts it when a worker requests a
+    wake-up and shuts it down when idle. Worker i serves its metrics on METRICS_PORT + 1 + i.
+    Each worker watches the config file itself; SIGHUP to the parent is passed on to them.
+    """
+    import asyncio
+    import os
+    import signal
+    from metrics import setup_logging
+    from workers import SharedState, ignore_interrupts, reuse_port_available, start_workers, stop_workers
+
+    if not reuse_port_available():
+        raise Exception("SO_REUSEPORT is not available on this platform, run with a single worker")
+
+    config = live_config.config
+    store = SharedState()
+    server_stores = {server.name: SharedState() for server in config.virtual_servers()}
+
+    def worker(index: int) -> None:
+        ignore_interrupts()
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)  # Until the worker installs its own reload handler
+        setup_logging(config.debug)
+        asyncio.run(run(live_config, create_hibernator(config, store, manages_backend=False), coordinate=False,
+                        reuse_port=True, worker=index,
+                        server_hibernators=create_server_hibernators(config, server_stores, manages_backend=False)))
+
+    processes = start_workers(count, worker)
+
+    def forward_reload(signum: int, frame) -> None:
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGHUP)
+
+    signal.signal(signal.SIGHUP, forward_reload)
+    try:
+        hibernator = create_hibernator(config, store)
+        server_hibernators = create_server_hibernators(config, server_stores)
+        if hibernator is None and not server_hibernators:
+            for process in processes:
+                process.join()
+        else:
+            asyncio.run(run(live_config, hibernator, listen=False, server_hibernators=server_hibernators))
+    finally:
+        stop_workers(processes)
+
+
 def main():
     """
     Main entry point.
     """
-    print("Program starting")
+    import argparse
+    import asyncio
+    from config import LiveConfig
+    from metrics import setup_logging
+
+    parser = argparse.ArgumentParser(description="Spoof a Minecraft server while the real one hibernates")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes accepting connections, sharing the port with SO_REUSEPORT")
+    parser.add_argument("--config", default=CONFIG_FILE,
+                        help="TOML or JSON file overriding the settings, reloaded on SIGHUP and when it changes")
+    args = parser.parse_args()
+
+    live_config = LiveConfig(args.config, CONFIG_CHECK_INTERVAL)
+    setup_logging(live_config.config.debug)
+    logger.info("Program starting")
+    if args.workers > 1:
+        run_workers(args.workers, live_config)
+    else:
+        asyncio.run(run(live_config, create_hibernator(live_config.config),
+                        server_hibernators=create_server_hibernators(live_config.config)))
 
-    print("Binding socket")
+
+def serve_serial(host: str = LISTEN_HOST, port: int = LISTEN_PORT) -> None:
+    """
+    Serve clients one at a time on a blocking socket.
+    Kept as a reference implementation and as the baseline for benchmarks/connections.py.
+    """
+    logger.info("Binding socket")
     listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     listen_socket.setblocking(True)
     listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    listen_socket.bind((LISTEN_HOST, LISTEN_PORT))
-    listen_socket.listen(5)
+    listen_socket.bind((host, port))
+    listen_socket.listen(LISTEN_BACKLOG)
 
-    print("Listening")
+    logger.info("Listening")
 
     # Continuously listen for new packets
     while True:
         client_socket, client_address = listen_socket.accept()
-        handle_client_socket(client_socket, client_address)
+        try:
+            handle_client_socket(client_socket, client_address)
+        except (OSError, ValueError) as e:
+            logger.debug("Dropping %s:%d: %r", client_address[0], client_address[1], e)
+            client_socket.close()
 
 
 if __name__ == '__main__':
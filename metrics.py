@@ -0,0 +1,156 @@
+import asyncio
+import bisect
+import logging
+import logging.handlers
+import os
+import queue
+from typing import List, Optional, Sequence, Union
+
+
+class Counter:
+    """
+    Monotonically increasing count
+    """
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets, Prometheus style
+    """
+    __slots__ = ("name", "help", "bounds", "counts", "sum", "count")
+
+    def __init__(self, name: str, help_text: str, bounds: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+_FAST = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+_JOIN = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+_SLOW = (5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 600)
+
+CONNECTIONS = Counter("hibernate_connections_total", "Connections accepted")
+REJECTED_CONNECTIONS = Counter("hibernate_rejected_connections_total", "Connections refused by admission control")
+STATUS_PINGS = Counter("hibernate_status_pings_total", "Status requests answered by the spoofer")
+LEGACY_PINGS = Counter("hibernate_legacy_pings_total", "Pre-1.7 server list pings")
+JOIN_ATTEMPTS = Counter("hibernate_join_attempts_total", "Login attempts while the backend was down")
+UNKNOWN_PACKETS = Counter("hibernate_unknown_packets_total", "Connections that did not start with a handshake")
+WAKEUPS = Counter("hibernate_wakeups_total", "Backend start-ups triggered")
+REJECTED_WAKEUPS = Counter("hibernate_rejected_wakeups_total", "Joins refused a wake-up by the whitelist")
+HANDSHAKE_PARSE = Histogram("hibernate_handshake_parse_seconds", "Time spent decoding a handshake", _FAST)
+STATUS_SEND = Histogram("hibernate_status_send_seconds", "Time spent sending a status response", _FAST)
+BACKEND_READY = Histogram("hibernate_backend_ready_seconds", "Time from wake-up to the backend accepting connections",
+                          _SLOW)
+JOIN_LATENCY = Histogram("hibernate_join_latency_seconds",
+                         "Time from a proxied join packet to the first byte back from the backend", _JOIN)
+
+REGISTRY: List[Union[Counter, Histogram]] = [
+    CONNECTIONS, REJECTED_CONNECTIONS, STATUS_PINGS, LEGACY_PINGS, JOIN_ATTEMPTS, UNKNOWN_PACKETS, WAKEUPS,
+    REJECTED_WAKEUPS, HANDSHAKE_PARSE, STATUS_SEND, BACKEND_READY, JOIN_LATENCY,
+]
+
+
+def render() -> str:
+    """
+    @return: All metrics in the Prometheus text exposition format
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+async def _handle_scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        # Whatever was requested, answer with the metrics
+        await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+        body = render().encode("utf-8")
+        writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                     b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+        await writer.drain()
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_metrics(host: str, port: int) -> None:
+    """
+    Serve the metrics over HTTP for Prometheus to scrape, until cancelled
+    """
+    server = await asyncio.start_server(_handle_scrape, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def dump_metrics(path: str, interval: float) -> None:
+    """
+    Write the metrics to a file every interval seconds, replacing it atomically, until cancelled
+    """
+    while True:
+        await asyncio.sleep(interval)
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            file.write(render())
+        os.replace(temporary, path)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records as they are; the listener thread does the formatting
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(debug: bool) -> None:
+    """
+    Route all logging through a queue, so the event loop only pays for an enqueue per message
+    and formatting and writing to stdout happen on a background thread.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger()
+    root.handlers = [_DeferredQueueHandler(log_queue)]
+    root.setLevel(logging.DEBUG if debug else logging.INFO)
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
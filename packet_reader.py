@@ -0,0 +1,173 @@
+import socket
+from typing import Optional, Tuple
+
+from varint import Buffer, IncompletePacket, MalformedPacket, PacketTooLong, decode_var_int
+
+# Largest packet the protocol allows
+MAX_PACKET_LENGTH = 2 ** 21 - 1
+
+
+class PacketBuffer:
+    """
+    Cursor over the contents of a single packet, offering the same decoders as main.py
+    but reading from memory instead of issuing a recv() per field
+    """
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: Buffer):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def _take(self, length: int) -> memoryview:
+        if length < 0:
+            raise MalformedPacket(f"Negative length {length}")
+        end = self.pos + length
+        if end > len(self.data):
+            raise IncompletePacket(f"Needed {length} bytes, {len(self.data) - self.pos} left in packet")
+        view = self.data[self.pos:end]
+        self.pos = end
+        return view
+
+    def read_var_int(self) -> Tuple[int, int]:
+        """
+        Read a VarInt from the packet
+        """
+        value, num_read = decode_var_int(self.data, self.pos)
+        self.pos += num_read
+        return value, num_read
+
+    def read_string(self) -> Tuple[str, int]:
+        """
+        Read a string from the packet
+        """
+        length, num_read = self.read_var_int()
+        result = str(self._take(length), "utf-8")
+        return result, num_read + length
+
+    def read_unsigned_short(self) -> Tuple[int, int]:
+        """
+        Read an unsigned short from the packet
+        """
+        return int.from_bytes(self._take(2), byteorder="big", signed=False), 2
+
+    def read_bool(self) -> Tuple[bool, int]:
+        """
+        Read a boolean from the packet
+        """
+        return self._take(1)[0] != 0, 1
+
+    def read_byte_array(self) -> Tuple[bytes, int]:
+        """
+        Read a VarInt length prefixed byte array from the packet
+        """
+        length, num_read = self.read_var_int()
+        return bytes(self._take(length)), num_read + length
+
+    def read_uuid(self) -> Tuple[str, int]:
+        """
+        Read a UUID (two big endian longs) from the packet
+        @return: The UUID in its usual dashed hex form
+        """
+        value = self._take(16).hex()
+        return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}", 16
+
+    def read_long(self) -> Tuple[int, int]:
+        """
+        Read a long from the packet
+        """
+        return int.from_bytes(self._take(8), byteorder="big", signed=True), 8
+
+    def remaining(self) -> memoryview:
+        """
+        @return: The unread part of the packet, without copying
+        """
+        return self.data[self.pos:]
+
+
+class PacketReader:
+    """
+    Reads length-prefixed packets from a socket through one growable buffer.
+
+    Data is pulled in with large recv_into() calls, so a status ping usually costs one or two
+    syscalls, and packets split over several TCP segments are reassembled correctly.
+    Frames are handed out as memoryviews into the buffer; the buffer is never resized in place,
+    so frames stay valid after later reads.
+    """
+
+    def __init__(self, sock: Optional[socket.socket] = None, buffer_size: int = 4096):
+        self.sock = sock
+        self.buffer = bytearray(buffer_size)
+        self.start = 0
+        self.end = 0
+
+    def buffered(self) -> memoryview:
+        """
+        @return: Data that has been received but not consumed yet
+        """
+        return memoryview(self.buffer)[self.start:self.end]
+
+    def _make_room(self, needed: int) -> None:
+        """
+        Make sure at least needed bytes fit after the buffered data
+        """
+        if len(self.buffer) - self.end >= needed:
+            return
+        pending = self.end - self.start
+        # Move to a fresh buffer rather than compacting so frames handed out earlier keep their data
+        new_buffer = bytearray(max(len(self.buffer), 2 * (pending + needed)))
+        new_buffer[:pending] = self.buffer[self.start:self.end]
+        self.buffer = new_buffer
+        self.start = 0
+        self.end = pending
+
+    def feed(self, data: Buffer) -> None:
+        """
+        Append data received by other means, e.g. from an asyncio stream
+        """
+        self._make_room(len(data))
+        self.buffer[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def fill(self, min_free: int = 1024) -> int:
+        """
+        Receive as much as the socket has ready into the buffer
+        @return: Number of bytes received, 0 on EOF
+        """
+        self._make_room(min_free)
+        received = self.sock.recv_into(memoryview(self.buffer)[self.end:])
+        self.end += received
+        return received
+
+    def next_frame(self, max_length: int = MAX_PACKET_LENGTH) -> Optional[PacketBuffer]:
+        """
+        Slice the next complete packet out of the buffer without reading from the socket
+        @param max_length: Longest packet to accept. Longer ones raise PacketTooLong before room is made for them.
+        @return: The packet, or None if it has not been fully received yet
+        """
+        try:
+            length, num_read = decode_var_int(self.buffer, self.start, self.end)
+        except IncompletePacket:
+            return None
+        if length < 0:
+            raise MalformedPacket(f"Negative packet length {length}")
+        if length > max_length:
+            raise PacketTooLong(f"Packet of {length} bytes, at most {max_length} expected")
+        frame_start = self.start + num_read
+        frame_end = frame_start + length
+        if frame_end > self.end:
+            self._make_room(frame_end - self.end)
+            return None
+        self.start = frame_end
+        return PacketBuffer(memoryview(self.buffer)[frame_start:frame_end])
+
+    def read_frame(self, max_length: int = MAX_PACKET_LENGTH) -> PacketBuffer:
+        """
+        Read the next complete packet, receiving more data as needed
+        @param max_length: Longest packet to accept, see next_frame()
+        """
+        while True:
+            frame = self.next_frame(max_length)
+            if frame is not None:
+                return frame
+            if self.fill() == 0:
+                raise ConnectionError("Connection closed in the middle of a packet")
@@ -0,0 +1,248 @@
+"""
+Start the backend ahead of the hours players usually join in.
+
+Run as a script to replay a history database offline and compare waiting time and uptime with and
+without pre-warming:
+
+    python prewarm.py history.sqlite3 [--threshold P] [--weeks W] [--lead S] [--grace S] ...
+"""
+import asyncio
+import logging
+import time
+from typing import Iterable, List, NamedTuple, Optional, Set
+
+from hibernation import Hibernator, State
+from history import HOUR, WEEK, HistoryStore
+from idle import IdleScheduler
+
+logger = logging.getLogger(__name__)
+
+WEEK_HOURS = WEEK // HOUR
+
+
+class JoinModel:
+    """
+    Probability that anyone joins during a given hour, from the same hour of the week in past weeks.
+
+    An hour of the week counts as busy in a past week if it had at least one join. The probability
+    is the fraction of the last `weeks` weeks in which it was busy, and 0 until at least min_weeks
+    weeks of history exist for it. Hours are counted since the epoch, so weeks follow UTC.
+    """
+
+    def __init__(self, busy_hours: Iterable[int], first_hour: Optional[int], weeks: int = 8, min_weeks: int = 2):
+        self.busy_hours: Set[int] = set(busy_hours)
+        self.first_hour = first_hour
+        self.weeks = weeks
+        self.min_weeks = min_weeks
+
+    @classmethod
+    def load(cls, history: HistoryStore, now: float, weeks: int = 8, min_weeks: int = 2) -> "JoinModel":
+        """
+        Build the model from the joins in the history, as of now
+        """
+        hourly = history.hourly_joins(now - (weeks + 1) * WEEK)
+        return cls((hour for hour, _ in hourly), history.first_join_hour(), weeks, min_weeks)
+
+    def probability(self, hour: int) -> float:
+        """
+        @param hour: Hour since the epoch
+        @return: Estimated probability of at least one join in that hour
+        """
+        if self.first_hour is None:
+            return 0.0
+        samples = busy = 0
+        for week in range(1, self.weeks + 1):
+            past = hour - week * WEEK_HOURS
+            if past < self.first_hour:
+                break
+            samples += 1
+            busy += past in self.busy_hours
+        if samples < self.min_weeks:
+            return 0.0
+        return busy / samples
+
+
+class PrewarmScheduler:
+    """
+    Wake the backend lead_time seconds before an hour whose join probability is at least threshold,
+    and hibernate it again if nobody has come grace seconds into that hour.
+
+    The idle scheduler is told to hold the pre-warmed backend up until then; once a player has been
+    seen on it, shutting it down is left to the idle scheduler again. Without a fixed lead_time the
+    backend's ETA, the median of its recent boot times, is used.
+    """
+
+    def __init__(self, hibernator: Hibernator, history: HistoryStore, idle: Optional[IdleScheduler] = None,
+                 threshold: float = 0.5, weeks: int = 8, min_weeks: int = 2, lead_time: Optional[float] = None,
+                 grace: float = 3600.0, check_interval: float = 60.0, rebuild_interval: float = 3600.0):
+        self.hibernator = hibernator
+        self.history = history
+        self.idle = idle
+        self.threshold = threshold
+        self.weeks = weeks
+        self.min_weeks = min_weeks
+        self.lead_time = lead_time
+        self.grace = grace
+        self.check_interval = check_interval
+        self.rebuild_interval = rebuild_interval
+        self.model: Optional[JoinModel] = None
+        self._built_at = 0.0
+        # Hour that was pre-warmed for, until a player shows up or the backend is hibernated again
+        self.prewarmed_hour: Optional[int] = None
+        self._last_prewarmed_hour: Optional[int] = None
+
+    def _lead_time(self) -> float:
+        if self.lead_time is not None:
+            return self.lead_time
+        eta = self.hibernator.eta()
+        return eta if eta is not None else 0.0
+
+    async def check(self, now: Optional[float] = None) -> None:
+        """
+        Pre-warm for the coming hour if it is likely busy, or give up on a pre-warm nobody came to
+        @param now: Current wall clock time, for testing
+        """
+        now = time.time() if now is None else now
+        if self.model is None or now - self._built_at >= self.rebuild_interval:
+            self.model = await asyncio.to_thread(JoinModel.load, self.history, now, self.weeks, self.min_weeks)
+            self._built_at = now
+
+        if self.prewarmed_hour is not None:
+            if self.hibernator.state == State.HIBERNATING:
+                self.prewarmed_hour = None
+            elif self.hibernator.active_sessions > 0:
+                logger.info("Pre-warmed backend is in use")
+                self.prewarmed_hour = None
+            elif self.hibernator.is_up and now >= self.prewarmed_hour * HOUR + self.grace:
+                logger.info("Nobody joined the pre-warmed backend, hibernating")
+                self.prewarmed_hour = None
+                await self.hibernator.hibernate()
+            return
+
+        hour = int((now + self._lead_time()) // HOUR)
+        if hour == self._last_prewarmed_hour or self.hibernator.state != State.HIBERNATING:
+            return
+        probability = self.model.probability(hour)
+        if probability >= self.threshold:
+            logger.info("Pre-warming the backend, %.0f%% chance of a join in the coming hour", probability * 100)
+            self.prewarmed_hour = self._last_prewarmed_hour = hour
+            self.hibernator.wake()
+            if self.idle is not None:
+                self.idle.hold(hour * HOUR + self.grace - now)
+
+    async def run(self) -> None:
+        """
+        Check forever
+        """
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Pre-warm check failed")
+            await asyncio.sleep(self.check_interval)
+
+
+class SimulationResult(NamedTuple):
+    joins: int
+    waits: int  # Joins that found the backend down or still starting
+    wait_seconds: float
+    uptime_seconds: float
+    prewarms: int
+    wasted_prewarms: int  # Pre-warms nobody joined
+
+
+def simulate(join_times: List[float], boot_time: float, session_time: float, idle_timeout: float,
+             threshold: Optional[float] = None, weeks: int = 8, min_weeks: int = 2, lead_time: Optional[float] = None,
+             grace: float = 3600.0) -> SimulationResult:
+    """
+    Replay joins against a simulated backend that takes boot_time seconds to start, is kept busy
+    session_time seconds by each join and shuts down after idle_timeout seconds without players.
+    With a threshold, pre-warm like PrewarmScheduler, using a model of the joins before each hour only.
+    """
+    lead = boot_time if lead_time is None else lead_time
+    events = [(timestamp, False) for timestamp in join_times]
+    model = None
+    if threshold is not None and join_times:
+        first_hour = int(join_times[0] // HOUR)
+        model = JoinModel((int(timestamp // HOUR) for timestamp in join_times), first_hour, weeks, min_weeks)
+        last_hour = int(join_times[-1] // HOUR)
+        events.extend((hour * HOUR - lead, True) for hour in range(first_hour + 1, last_hour + 1))
+    events.sort()
+
+    waits = prewarms = wasted = 0
+    wait_seconds = uptime = 0.0
+    started: Optional[float] = None
+    ready = busy_until = 0.0
+    unused_until: Optional[float] = None  # Set while a pre-warm has not been joined yet
+
+    def shutdown_time() -> float:
+        if unused_until is not None:
+            return max(unused_until, ready)
+        return max(ready, busy_until) + idle_timeout
+
+    for timestamp, prewarm in events:
+        if started is not None and timestamp >= shutdown_time():
+            uptime += shutdown_time() - started
+            wasted += unused_until is not None
+            started, unused_until = None, None
+
+        if prewarm:
+            hour = int((timestamp + lead) // HOUR)
+            if started is None and model.probability(hour) >= threshold:
+                started, ready = timestamp, timestamp + boot_time
+                busy_until = ready
+                unused_until = hour * HOUR + grace
+                prewarms += 1
+            continue
+
+        if started is None:
+            started, ready = timestamp, timestamp + boot_time
+        if timestamp < ready:
+            waits += 1
+            wait_seconds += ready - timestamp
+        busy_until = max(busy_until, max(timestamp, ready) + session_time)
+        unused_until = None
+
+    if started is not None:
+        uptime += shutdown_time() - started
+        wasted += unused_until is not None
+    return SimulationResult(len(join_times), waits, wait_seconds, uptime, prewarms, wasted)
+
+
+def main() -> None:
+    import argparse
+    import main as settings
+
+    parser = argparse.ArgumentParser(description="Replay a history database with and without pre-warming")
+    parser.add_argument("history", help="History database, see HISTORY_FILE")
+    parser.add_argument("--threshold", type=float, default=settings.PREWARM_THRESHOLD or 0.5)
+    parser.add_argument("--weeks", type=int, default=settings.PREWARM_WEEKS)
+    parser.add_argument("--min-weeks", type=int, default=settings.PREWARM_MIN_WEEKS)
+    parser.add_argument("--lead", type=float, default=settings.PREWARM_LEAD_TIME,
+                        help="Seconds to start ahead of a busy hour, the median boot time by default")
+    parser.add_argument("--grace", type=float, default=settings.PREWARM_GRACE)
+    parser.add_argument("--idle-timeout", type=float, default=settings.IDLE_TIMEOUT)
+    parser.add_argument("--boot-time", type=float, help="Seconds to start the backend, the recorded median by default")
+    parser.add_argument("--session-time", type=float,
+                        help="Seconds a join keeps the backend busy, the recorded median session by default")
+    args = parser.parse_args()
+
+    history = HistoryStore(args.history)
+    join_times = history.join_times()
+    boot_time = args.boot_time or history.median_boot_time(0.0) or 60.0
+    session_time = args.session_time or history.median_session_time(0.0) or 1800.0
+    history.close()
+
+    baseline = simulate(join_times, boot_time, session_time, args.idle_timeout)
+    prewarmed = simulate(join_times, boot_time, session_time, args.idle_timeout, args.threshold, args.weeks,
+                         args.min_weeks, args.lead, args.grace)
+    print(f"{len(join_times)} joins, boot time {boot_time:.0f} s, session time {session_time:.0f} s")
+    for name, result in (("on join", baseline), ("pre-warmed", prewarmed)):
+        print(f"{name:>10}: {result.waits:6} joins waited {result.wait_seconds / 3600:8.1f} h, uptime "
+              f"{result.uptime_seconds / 3600:8.1f} h, {result.prewarms} pre-warms ({result.wasted_prewarms} unused)")
+    print(f"Saved {(baseline.wait_seconds - prewarmed.wait_seconds) / 3600:.1f} h of waiting for "
+          f"{(prewarmed.uptime_seconds - baseline.uptime_seconds) / 3600:.1f} h of extra uptime")
+
+
+if __name__ == "__main__":
+    main()
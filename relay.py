@@ -0,0 +1,123 @@
+import errno
+import os
+import socket
+import threading
+from typing import Callable, Optional
+
+# os.splice moves data between a socket and a pipe inside the kernel (Linux, Python 3.10+)
+SPLICE_AVAILABLE = hasattr(os, "splice")
+# SPLICE_F_MORE is left out on purpose: it corks the socket and stalls small game packets
+SPLICE_FLAGS = getattr(os, "SPLICE_F_MOVE", 0)
+
+
+class Relay:
+    """
+    Bidirectional relay between a client and the backend, one thread per direction.
+
+    Data is moved with os.splice() through a pipe where the kernel supports it, so it never
+    enters Python. Otherwise each direction copies through a buffer allocated once up front
+    with recv_into(). Both sockets must be blocking; the relay owns and closes them.
+    """
+
+    def __init__(self, client: socket.socket, backend: socket.socket, buffer_size: int = 65536,
+                 use_splice: bool = SPLICE_AVAILABLE, on_first_byte: Optional[Callable[[], None]] = None):
+        """
+        @param client:
+        @param backend:
+        @param buffer_size: Bytes moved per syscall
+        @param use_splice: Try os.splice() before falling back to recv_into()
+        @param on_first_byte: Called once the first backend data has been sent to the client
+        """
+        self.client = client
+        self.backend = backend
+        self.buffer_size = buffer_size
+        self.use_splice = use_splice
+        self.on_first_byte = on_first_byte
+        self.client_to_backend = 0
+        self.backend_to_client = 0
+        self._buffers = (bytearray(buffer_size), bytearray(buffer_size))
+        self._remaining = 2
+        self._lock = threading.Lock()
+        self._on_done: Optional[Callable[["Relay"], None]] = None
+
+    def start(self, on_done: Optional[Callable[["Relay"], None]] = None) -> None:
+        """
+        Start relaying in background threads
+        @param on_done: Called from a relay thread with this relay once both directions are closed
+        """
+        self._on_done = on_done
+        threading.Thread(target=self._run_direction, args=(True,), daemon=True).start()
+        threading.Thread(target=self._run_direction, args=(False,), daemon=True).start()
+
+    def _count(self, upstream: bool, count: int) -> None:
+        if upstream:
+            self.client_to_backend += count
+        else:
+            if self.backend_to_client == 0 and self.on_first_byte is not None:
+                self.on_first_byte()
+            self.backend_to_client += count
+
+    def _run_direction(self, upstream: bool) -> None:
+        source, destination = (self.client, self.backend) if upstream else (self.backend, self.client)
+        try:
+            if not (self.use_splice and self._splice(source, destination, upstream)):
+                self._copy(source, destination, upstream)
+            # Pass the EOF on, the other direction may still have data in flight
+            destination.shutdown(socket.SHUT_WR)
+        except OSError:
+            # One side is gone, unblock the other direction as well
+            for sock in (source, destination):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        finally:
+            self._direction_done()
+
+    def _splice(self, source: socket.socket, destination: socket.socket, upstream: bool) -> bool:
+        """
+        Relay until EOF with os.splice()
+        @return: False if splice is not supported for these sockets and nothing was relayed
+        """
+        read_end, write_end = os.pipe()
+        relayed = False
+        try:
+            while True:
+                try:
+                    moved = os.splice(source.fileno(), write_end, self.buffer_size, flags=SPLICE_FLAGS)
+                except OSError as e:
+                    if e.errno == errno.EINVAL and not relayed:
+                        return False
+                    raise
+                if moved == 0:
+                    return True
+                pending = moved
+                while pending:
+                    pending -= os.splice(read_end, destination.fileno(), pending, flags=SPLICE_FLAGS)
+                relayed = True
+                self._count(upstream, moved)
+        finally:
+            os.close(read_end)
+            os.close(write_end)
+
+    def _copy(self, source: socket.socket, destination: socket.socket, upstream: bool) -> None:
+        """
+        Relay until EOF through this direction's preallocated buffer
+        """
+        view = memoryview(self._buffers[0 if upstream else 1])
+        while True:
+            received = source.recv_into(view)
+            if received == 0:
+                return
+            destination.sendall(view[:received])
+            self._count(upstream, received)
+
+    def _direction_done(self) -> None:
+        with self._lock:
+            self._remaining -= 1
+            if self._remaining:
+                return
+        self.client.close()
+        self.backend.close()
+        if self._on_done is not None:
+            self._on_done(self)
@@ -0,0 +1,132 @@
+"""
+Tests for loading and hot-reloading the config file.
+
+Usage: python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config, LiveConfig, _restart_changes, load_config  # noqa: E402
+
+BASE = Config.from_settings()
+SERVER = {"name": "survival", "hosts": ["survival.example.com"], "motd": "Survival", "backend_port": 25570}
+
+
+def write(path, values) -> str:
+    with open(path, "w") as file:
+        json.dump(values, file)
+    return str(path)
+
+
+def test_load_toml(tmp_path):
+    path = tmp_path / "hibernate.toml"
+    path.write_text('motd = "Hello"\nread_timeout = 3\n[[servers]]\nhosts = ["a.example.com"]\n')
+    config = load_config(str(path), BASE)
+    assert config.motd == "Hello"
+    assert config.read_timeout == 3.0 and isinstance(config.read_timeout, float)
+    assert config.virtual_servers()[0].name == "a.example.com"
+    assert config.listen_port == BASE.listen_port
+
+
+@pytest.mark.parametrize("values", [
+    {"no_such_setting": 1},
+    {"listen_port": "25565"},
+    {"max_players": 1.5},
+    {"debug": 1},
+    {"whitelist_files": "whitelist.json"},
+    {"server_protocol": 9999},
+    {"servers": [{"motd": "No hosts"}]},
+    {"servers": [{"hosts": []}]},
+    {"servers": [{"hosts": ["a"], "name": "x"}, {"hosts": ["b"], "name": "x"}]},
+    {"servers": [{"hosts": ["a"], "servers": []}]},
+    {"servers": [{"hosts": ["a"], "server_protocol": 9999}]},
+    {"servers": [{"hosts": ["a"], "max_players": "many"}]},
+    ["not", "a", "table"],
+])
+def test_invalid_files_are_rejected(tmp_path, values):
+    with pytest.raises(ValueError):
+        load_config(write(tmp_path / "config.json", values), BASE)
+
+
+def test_invalid_toml_is_rejected(tmp_path):
+    path = tmp_path / "hibernate.toml"
+    path.write_text('motd = "unterminated\n')
+    with pytest.raises(ValueError):
+        load_config(str(path), BASE)
+
+
+def test_restart_changes():
+    new = BASE.replace({"motd": "New", "listen_port": 1, "backend_port": 2})
+    assert sorted(_restart_changes(BASE, new)) == ["backend_port", "listen_port"]
+
+    old = BASE.replace({"servers": [SERVER]})
+    changed = BASE.replace({"servers": [{**SERVER, "motd": "Changed", "backend_port": 25571}]})
+    assert _restart_changes(old, changed) == ["servers.survival.backend_port"]
+    renamed = BASE.replace({"servers": [{**SERVER, "name": "creative"}]})
+    assert _restart_changes(old, renamed) == ["servers"]
+
+
+def test_missing_file_uses_settings(tmp_path):
+    live = LiveConfig(str(tmp_path / "missing.json"), check_interval=0.0, base=BASE)
+    assert live.config == BASE
+
+
+def test_invalid_file_fails_at_start_up(tmp_path):
+    with pytest.raises(ValueError):
+        LiveConfig(write(tmp_path / "config.json", {"motd": 1}), base=BASE)
+
+
+def test_reload_applies_reloadable_settings_only(tmp_path):
+    path = write(tmp_path / "config.json", {"motd": "One"})
+    live = LiveConfig(path, check_interval=0.0, base=BASE)
+    snapshot = live.current
+    assert live.config.motd == "One"
+
+    write(path, {"motd": "Two", "listen_port": BASE.listen_port + 1})
+    live.refresh(force=True)
+    assert live.config.motd == "Two"
+    # Restart-only settings keep the value the listener is running with
+    assert live.config.listen_port == BASE.listen_port
+    # Nothing the status packets depend on changed, so the cache is kept
+    assert live.current.status_cache is snapshot.status_cache
+
+
+def test_invalid_reload_keeps_snapshot(tmp_path):
+    path = write(tmp_path / "config.json", {"motd": "One"})
+    live = LiveConfig(path, check_interval=0.0, base=BASE)
+    snapshot = live.current
+    write(path, {"motd": "Two", "server_protocol": 9999})
+    live.refresh(force=True)
+    assert live.current is snapshot
+
+
+def test_deleted_file_reverts_to_settings(tmp_path):
+    path = write(tmp_path / "config.json", {"motd": "One"})
+    live = LiveConfig(path, check_interval=0.0, base=BASE)
+    os.remove(path)
+    live.refresh(force=True)
+    assert live.config.motd == BASE.motd
+
+
+def test_reload_virtual_servers(tmp_path):
+    path = write(tmp_path / "config.json", {"servers": [SERVER]})
+    live = LiveConfig(path, check_interval=0.0, base=BASE)
+    assert live.current.routes.get("survival.example.com") is live.current.servers["survival"]
+
+    write(path, {"servers": [{**SERVER, "hosts": ["mc.example.com"], "motd": "Changed", "backend_port": 25571}]})
+    live.refresh(force=True)
+    server = live.current.servers["survival"]
+    assert server.config.motd == "Changed"
+    assert server.config.backend_port == 25570
+    assert live.current.routes.get("mc.example.com") is server
+    assert live.current.routes.get("survival.example.com") is None
+
+    # Adding a server needs a restart, so the running servers are kept
+    write(path, {"servers": [SERVER, {"name": "creative", "hosts": ["creative.example.com"]}]})
+    live.refresh(force=True)
+    assert set(live.current.servers) == {"survival"}
@@ -0,0 +1,43 @@
+"""
+Tests for FileWatch change detection.
+
+Usage: python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filewatch import FileWatch  # noqa: E402
+
+
+def touch(path, mtime: float) -> None:
+    with open(path, "w") as file:
+        file.write("x")
+    os.utime(path, (mtime, mtime))
+
+
+def test_reports_until_committed(tmp_path):
+    path = str(tmp_path / "file")
+    touch(path, 1000)
+    watch = FileWatch([path, str(tmp_path / "missing")], 0.0)
+    assert watch.check() == [1000, None]
+    # Not committed, e.g. the load failed, so it is reported again
+    assert watch.check() == [1000, None]
+    watch.commit([1000, None])
+    assert watch.check() is None
+    touch(path, 2000)
+    assert watch.check() == [2000, None]
+
+
+def test_interval_and_force(tmp_path):
+    path = str(tmp_path / "file")
+    touch(path, 1000)
+    watch = FileWatch([path], 3600.0)
+    watch.commit(watch.check())
+    touch(path, 2000)
+    assert watch.check() is None
+    assert watch.check(force=True) == [2000]
+    watch.commit([2000])
+    assert watch.check(force=True) is None
+    assert watch.check(force=True, always=True) == [2000]
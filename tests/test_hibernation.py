@@ -0,0 +1,164 @@
+"""
+Tests for the Hibernator state machine, with a stub backend that listens on a local port while started.
+
+Usage: python -m pytest tests
+"""
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics  # noqa: E402
+from hibernation import Backend, Hibernator, State  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubBackend(Backend):
+    """
+    Listens on port between start() and stop(). stop() takes stop_delay seconds.
+    """
+
+    def __init__(self, port: int, stop_delay: float = 0.0, fail_start: bool = False):
+        super().__init__()
+        self.port = port
+        self.stop_delay = stop_delay
+        self.fail_start = fail_start
+        self.sock = None
+        self.events = []
+        self.stopping = threading.Event()
+
+    def start(self) -> None:
+        self.events.append("start")
+        if self.fail_start:
+            raise RuntimeError("start failed")
+        if self.sock is None:
+            self.sock = socket.socket()
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind(("127.0.0.1", self.port))
+            self.sock.listen()
+
+    def stop(self) -> None:
+        self.events.append("stop")
+        self.stopping.set()
+        time.sleep(self.stop_delay)
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        self.events.append("stopped")
+
+
+def make_hibernator(**backend_options) -> Hibernator:
+    port = free_port()
+    return Hibernator(StubBackend(port, **backend_options), "127.0.0.1", port, start_timeout=5.0,
+                      poll_interval=0.02)
+
+
+def test_wake_and_hibernate():
+    async def scenario():
+        hibernator = make_hibernator()
+        assert hibernator.state == State.HIBERNATING and not hibernator.is_up
+        hibernator.wake("alice")
+        assert hibernator.state == State.STARTING and not hibernator.is_up
+        assert await hibernator.wait_online(5)
+        assert hibernator.state == State.ONLINE
+        await hibernator.hibernate()
+        assert hibernator.state == State.HIBERNATING
+        return hibernator.backend.events
+
+    assert asyncio.run(scenario()) == ["start", "stop", "stopped"]
+
+
+def test_wake_is_idempotent():
+    async def scenario():
+        hibernator = make_hibernator()
+        wakeups = metrics.WAKEUPS.value
+        hibernator.wake()
+        hibernator.wake()
+        assert await hibernator.wait_online(5)
+        hibernator.wake()
+        assert metrics.WAKEUPS.value == wakeups + 1
+        await hibernator.hibernate()
+        return hibernator.backend.events
+
+    assert asyncio.run(scenario()).count("start") == 1
+
+
+def test_idle_and_active():
+    async def scenario():
+        hibernator = make_hibernator()
+        hibernator.wake()
+        assert await hibernator.wait_online(5)
+        hibernator.mark_idle()
+        assert hibernator.state == State.IDLE and hibernator.is_up
+        hibernator.session_started()
+        assert hibernator.state == State.ONLINE and hibernator.active_sessions == 1
+        hibernator.session_ended("127.0.0.1", 1.0)
+        assert hibernator.active_sessions == 0
+        assert hibernator.last_activity > 0
+        await hibernator.hibernate()
+
+    asyncio.run(scenario())
+
+
+def test_join_while_stopping_restarts_after_stop():
+    async def scenario():
+        hibernator = make_hibernator(stop_delay=0.3)
+        hibernator.wake()
+        assert await hibernator.wait_online(5)
+        stop = asyncio.create_task(hibernator.hibernate())
+        await asyncio.to_thread(hibernator.backend.stopping.wait, 5)
+        assert hibernator.state == State.STOPPING and not hibernator.is_up
+
+        hibernator.wake("bob")
+        assert hibernator.state == State.STARTING
+        await stop
+        # The stop found a wake-up in progress and left the state alone
+        assert hibernator.state != State.HIBERNATING
+        assert await hibernator.wait_online(5)
+        assert hibernator.backend.sock is not None
+        await hibernator.hibernate()
+        return hibernator.backend.events
+
+    # The second start waited for the first stop to finish
+    assert asyncio.run(scenario()) == ["start", "stop", "stopped", "start", "stop", "stopped"]
+
+
+def test_backend_lock_serializes_start_and_stop():
+    async def scenario():
+        hibernator = make_hibernator(stop_delay=0.2)
+        hibernator.wake()
+        assert await hibernator.wait_online(5)
+        stop = asyncio.create_task(hibernator.hibernate())
+        await asyncio.to_thread(hibernator.backend.stopping.wait, 5)
+        assert hibernator.backend.lock.locked()
+        await asyncio.to_thread(hibernator._run_backend, hibernator.backend.start)
+        await stop
+        return hibernator.backend.events
+
+    assert asyncio.run(scenario()) == ["start", "stop", "stopped", "start"]
+
+
+def test_failed_start_hibernates():
+    async def scenario():
+        hibernator = make_hibernator(fail_start=True)
+        hibernator.wake()
+        await hibernator._wake_task
+        return hibernator.state
+
+    assert asyncio.run(scenario()) == State.HIBERNATING
+
+
+def test_join_latency_metric():
+    hibernator = make_hibernator()
+    count = metrics.JOIN_LATENCY.count
+    hibernator.record_join_latency(0.02)
+    assert metrics.JOIN_LATENCY.count == count + 1
@@ -0,0 +1,71 @@
+"""
+Tests for Login Start parsing across its packet layouts, and the ETA formatting.
+
+Usage: python -m pytest tests
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from login import (PROTOCOL_1_19, PROTOCOL_1_19_1, PROTOCOL_1_19_3, PROTOCOL_1_20_2, format_eta,  # noqa: E402
+                   read_login_start)
+from main import encode_long, encode_string, encode_var_int  # noqa: E402
+from packet_reader import IncompletePacket, PacketBuffer  # noqa: E402
+
+PLAYER_UUID = uuid.UUID("069a79f4-44e9-4726-a5be-fca90e38aaf5")
+SIGNATURE = b"\x01" + bytes(encode_long(1700000000000)) + encode_var_int(4) + b"\x30\x82\x01\x22" \
+    + encode_var_int(3) + b"sig"
+
+
+def login_start(body: bytes) -> PacketBuffer:
+    """
+    @return: A Login Start packet positioned after its packet id, as handle_login() reads it
+    """
+    packet = PacketBuffer(encode_var_int(0) + bytes(encode_string("Notch")) + body)
+    packet.read_var_int()
+    return packet
+
+
+def test_before_1_19():
+    assert read_login_start(login_start(b""), PROTOCOL_1_19 - 1) == ("Notch", None)
+
+
+@pytest.mark.parametrize("signature", [b"\x00", SIGNATURE])
+def test_1_19(signature):
+    packet = login_start(signature)
+    assert read_login_start(packet, PROTOCOL_1_19) == ("Notch", None)
+    assert len(packet.remaining()) == 0
+
+
+@pytest.mark.parametrize("signature", [b"\x00", SIGNATURE])
+def test_1_19_1(signature):
+    assert read_login_start(login_start(signature + b"\x01" + PLAYER_UUID.bytes), PROTOCOL_1_19_1) \
+        == ("Notch", str(PLAYER_UUID))
+    assert read_login_start(login_start(signature + b"\x00"), PROTOCOL_1_19_1) == ("Notch", None)
+
+
+@pytest.mark.parametrize("protocol", [PROTOCOL_1_19_3, PROTOCOL_1_20_2 - 1])
+def test_1_19_3(protocol):
+    assert read_login_start(login_start(b"\x01" + PLAYER_UUID.bytes), protocol) == ("Notch", str(PLAYER_UUID))
+    assert read_login_start(login_start(b"\x00"), protocol) == ("Notch", None)
+
+
+@pytest.mark.parametrize("protocol", [PROTOCOL_1_20_2, 772])
+def test_1_20_2(protocol):
+    assert read_login_start(login_start(PLAYER_UUID.bytes), protocol) == ("Notch", str(PLAYER_UUID))
+
+
+def test_truncated():
+    with pytest.raises(IncompletePacket):
+        read_login_start(login_start(PLAYER_UUID.bytes[:8]), PROTOCOL_1_20_2)
+
+
+@pytest.mark.parametrize("seconds, text", [
+    (0, "10 seconds"), (11, "20 seconds"), (60, "60 seconds"), (61, "2 minutes"), (300, "5 minutes"),
+])
+def test_format_eta(seconds, text):
+    assert format_eta(seconds) == text
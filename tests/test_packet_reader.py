@@ -0,0 +1,63 @@
+"""
+Tests for PacketBuffer and PacketReader.
+
+Usage: python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from packet_reader import IncompletePacket, MalformedPacket, PacketBuffer, PacketReader, PacketTooLong  # noqa: E402
+from varint import encode_var_int  # noqa: E402
+
+
+def test_read_fields():
+    packet = PacketBuffer(encode_var_int(300) + b"\x05hello" + b"\x63\xdd" + b"\x01")
+    assert packet.read_var_int() == (300, 2)
+    assert packet.read_string() == ("hello", 6)
+    assert packet.read_unsigned_short() == (25565, 2)
+    assert packet.read_bool() == (True, 1)
+    assert len(packet.remaining()) == 0
+
+
+def test_read_past_end():
+    packet = PacketBuffer(b"\x05hel")
+    with pytest.raises(IncompletePacket):
+        packet.read_string()
+
+
+@pytest.mark.parametrize("read", [PacketBuffer.read_string, PacketBuffer.read_byte_array])
+def test_negative_length(read):
+    packet = PacketBuffer(b"\x00\x00\x00\x00" + encode_var_int(-3) + b"abc")
+    packet.pos = 4
+    with pytest.raises(MalformedPacket):
+        read(packet)
+
+
+def test_frames_split_over_feeds():
+    reader = PacketReader()
+    data = encode_var_int(3) + b"abc" + encode_var_int(2) + b"de"
+    reader.feed(data[:2])
+    assert reader.next_frame() is None
+    reader.feed(data[2:])
+    assert bytes(reader.next_frame().data) == b"abc"
+    assert bytes(reader.next_frame().data) == b"de"
+    assert reader.next_frame() is None
+
+
+def test_frame_too_long():
+    reader = PacketReader(buffer_size=64)
+    reader.feed(b"\xff\xff\xff\xff\x03")
+    with pytest.raises(PacketTooLong):
+        reader.next_frame()
+    assert len(reader.buffer) == 64
+
+
+def test_frame_over_max_length():
+    reader = PacketReader()
+    reader.feed(encode_var_int(20) + bytes(20))
+    with pytest.raises(PacketTooLong):
+        reader.next_frame(max_length=16)
@@ -0,0 +1,79 @@
+"""
+Round-trip tests for the varint module.
+
+Usage: python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import varint  # noqa: E402
+
+BOUNDARIES = [
+    0, 1, 0x7F, 0x80, 0x3FFF, 0x4000, 2 ** 21 - 1, 2 ** 21, 2 ** 28 - 1, 2 ** 28, 2 ** 31 - 1,
+    -1, -2 ** 31,
+]
+
+
+def random_values(count: int = 1000) -> list:
+    rng = random.Random(1234)
+    return [rng.randrange(-2 ** 31, 2 ** 31) for _ in range(count)]
+
+
+@pytest.mark.parametrize("value", BOUNDARIES)
+def test_boundary_round_trip(value):
+    encoded = varint.encode_var_int(value)
+    assert varint.decode_var_int(encoded) == (value, len(encoded))
+
+
+@pytest.mark.parametrize("value, size", [
+    (0x7F, 1), (0x80, 2), (0x3FFF, 2), (0x4000, 3), (2 ** 21 - 1, 3), (2 ** 21, 4), (2 ** 28 - 1, 4),
+    (2 ** 28, 5), (2 ** 31 - 1, 5), (-1, 5), (-2 ** 31, 5),
+])
+def test_encoded_size(value, size):
+    assert len(varint.encode_var_int(value)) == size
+
+
+def test_random_round_trip():
+    for value in random_values():
+        encoded = varint.encode_var_int(value)
+        assert varint.decode_var_int(encoded) == (value, len(encoded))
+
+
+def test_decode_at_offset():
+    data = b"\xff" + varint.encode_var_int(300) + b"\xff"
+    assert varint.decode_var_int(data, 1, len(data) - 1) == (300, 2)
+
+
+def test_bulk_round_trip():
+    values = BOUNDARIES + random_values()
+    packed = varint.encode_var_ints(values)
+    assert packed == b"".join(varint.encode_var_int(value) for value in values)
+    assert varint.decode_var_ints(packed) == values
+
+
+@pytest.mark.parametrize("value", [2 ** 31, 2 ** 32, -2 ** 31 - 1, 2 ** 64])
+def test_encode_out_of_range(value):
+    with pytest.raises(ValueError):
+        varint.encode_var_int(value)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x80", b"\xff\xff\xff\xff"])
+def test_decode_incomplete(data):
+    with pytest.raises(varint.IncompletePacket):
+        varint.decode_var_int(data)
+
+
+def test_decode_too_long():
+    with pytest.raises(varint.MalformedPacket):
+        varint.decode_var_int(b"\xff\xff\xff\xff\xff\x01")
+
+
+@pytest.mark.parametrize("data", [b"\xff\xff\xff\xff\x7f", b"\x80\x80\x80\x80\x10"])
+def test_decode_over_32_bits(data):
+    with pytest.raises(varint.MalformedPacket):
+        varint.decode_var_int(data)
@@ -0,0 +1,106 @@
+import struct
+from typing import Iterable, List, Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Every value below 128 encodes to a single byte, precomputed once
+_SMALL = tuple(bytes((value,)) for value in range(128))
+_PACK_SHORT = struct.Struct("<H").pack
+
+
+class IncompletePacket(Exception):
+    """
+    Raised when a decoder runs past the end of the data it was given
+    """
+
+
+class MalformedPacket(ValueError):
+    """
+    Raised when data cannot be part of a valid packet, e.g. a VarInt longer than 5 bytes
+    """
+
+
+class PacketTooLong(MalformedPacket):
+    """
+    Raised when a client announces a packet longer than we are willing to buffer
+    """
+
+
+def encode_var_int(value: int) -> bytes:
+    """
+    Encode a Python integer as an MC VarInt type. Negative values are encoded as their 32 bit
+    two's complement, taking 5 bytes. Values outside the int32 range raise ValueError.
+    """
+    if 0 <= value < 0x80:
+        return _SMALL[value]
+    if 0 <= value < 0x4000:
+        return _PACK_SHORT((value & 0x7F) | 0x80 | (value >> 7) << 8)
+    if not -0x80000000 <= value <= 0x7FFFFFFF:
+        raise ValueError(f"{value} does not fit in a VarInt")
+
+    value &= 0xFFFFFFFF
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def decode_var_int(data: Buffer, pos: int = 0, end: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Decode a VarInt from a buffer
+    @param data: Buffer to read from
+    @param pos: Offset of the first byte of the VarInt
+    @param end: Offset one past the last usable byte, defaults to the end of the buffer
+    @return: The value and the number of bytes it took
+    """
+    if end is None:
+        end = len(data)
+    if pos >= end:
+        raise IncompletePacket("Buffer ends inside a VarInt")
+    first = data[pos]
+    if first < 0x80:
+        return first, 1
+    if pos + 1 < end:
+        second = data[pos + 1]
+        if second < 0x80:
+            return (first & 0x7F) | second << 7, 2
+
+    result = first & 0x7F
+    for bytes_read in range(1, 5):
+        if pos + bytes_read >= end:
+            raise IncompletePacket("Buffer ends inside a VarInt")
+        read = data[pos + bytes_read]
+        if read < 0x80:
+            if bytes_read == 4 and read > 0x0F:
+                # Only the low 4 bits of the fifth byte are part of an int32
+                raise MalformedPacket("VarInt does not fit in 32 bits")
+            result |= read << (7 * bytes_read)
+            if result >= 0x80000000:
+                result -= 1 << 32
+            return result, bytes_read + 1
+        result |= (read & 0x7F) << (7 * bytes_read)
+
+    raise MalformedPacket("More than 5 bytes in VarInt")
+
+
+def encode_var_ints(values: Iterable[int]) -> bytes:
+    """
+    Encode a sequence of integers as consecutive VarInts
+    """
+    return b"".join(map(encode_var_int, values))
+
+
+def decode_var_ints(data: Buffer) -> List[int]:
+    """
+    Decode a buffer consisting only of consecutive VarInts
+    """
+    result = []
+    pos = 0
+    end = len(data)
+    while pos < end:
+        value, size = decode_var_int(data, pos, end)
+        result.append(value)
+        pos += size
+    return result
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+from typing import Dict, NamedTuple
+
+VERSIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions.json")
+
+
+class Version(NamedTuple):
+    """
+    A protocol version and the packet ids the spoofer needs for it
+    """
+    protocol: int
+    name: str
+    status_response: int
+    pong: int
+    login_disconnect: int
+
+
+class VersionTable:
+    """
+    Protocol numbers mapped to version names and packet ids, loaded once from versions.json.
+
+    Entries can override any of the default packet ids under "packets".
+    """
+
+    def __init__(self, versions: Dict[int, Version]):
+        self.versions = versions
+
+    @classmethod
+    def load(cls, path: str = VERSIONS_FILE) -> "VersionTable":
+        with open(path) as file:
+            data = json.load(file)
+        defaults = data.get("packets", {})
+        versions = {}
+        for entry in data["versions"]:
+            packets = {**defaults, **entry}
+            versions[entry["protocol"]] = Version(
+                protocol=entry["protocol"],
+                name=sys.intern(entry["name"]),
+                status_response=packets["status_response"],
+                pong=packets["pong"],
+                login_disconnect=packets["login_disconnect"],
+            )
+        return cls(versions)
+
+    def __contains__(self, protocol: int) -> bool:
+        return protocol in self.versions
+
+    def get(self, protocol: int) -> Version:
+        """
+        @return: The version with exactly this protocol number
+        """
+        return self.versions[protocol]
+
+    def compatible(self, protocol: int, fallback: int) -> Version:
+        """
+        The version to report to a client speaking protocol: its own version if we know it,
+        so the client lists the server as compatible, otherwise the fallback version.
+        """
+        version = self.versions.get(protocol)
+        if version is None:
+            version = self.versions[fallback]
+        return version
+
+
+VERSIONS = VersionTable.load()
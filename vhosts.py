@@ -0,0 +1,59 @@
+from typing import Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_host(server_address: str) -> str:
+    """
+    Hostname a client connected to, as sent in its handshake
+    @return: The hostname in lowercase, without a trailing dot or anything a mod loader or proxy appended
+    """
+    # Forge appends "\0FML\0", BungeeCord IP forwarding "\0<ip>\0<uuid>\0<properties JSON>"
+    end = server_address.find("\0")
+    if end != -1:
+        server_address = server_address[:end]
+    return server_address.rstrip(".").lower()
+
+
+class HostRouter(Generic[T]):
+    """
+    Hostnames mapped to values, by exact name or by wildcard pattern like "*.example.com".
+
+    Exact names are one dict lookup. Wildcards are stored by their suffix, and a lookup tries the
+    suffixes of the hostname from the longest down, so the most specific pattern wins. Either way
+    the cost depends on the number of labels in the hostname, not on the number of routes.
+    """
+
+    def __init__(self):
+        self.exact: Dict[str, T] = {}
+        self.suffixes: Dict[str, T] = {}
+
+    def add(self, pattern: str, value: T) -> None:
+        """
+        @param pattern: A hostname, or "*." followed by the domain whose subdomains should match
+        """
+        pattern = normalize_host(pattern)
+        routes, key = (self.suffixes, pattern[2:]) if pattern.startswith("*.") else (self.exact, pattern)
+        if key in routes:
+            raise ValueError(f"Host {pattern!r} is routed twice")
+        routes[key] = value
+
+    def get(self, host: str, default: Optional[T] = None) -> Optional[T]:
+        """
+        @param host: A normalized hostname
+        @return: The value for the exact hostname, or for the most specific wildcard matching it
+        """
+        value = self.exact.get(host)
+        if value is not None:
+            return value
+        if self.suffixes:
+            dot = host.find(".")
+            while dot != -1:
+                value = self.suffixes.get(host[dot + 1:])
+                if value is not None:
+                    return value
+                dot = host.find(".", dot + 1)
+        return default
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.suffixes)
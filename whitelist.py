@@ -0,0 +1,71 @@
+import json
+import logging
+from typing import FrozenSet, List, Optional
+
+from filewatch import FileWatch
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_uuid(uuid: str) -> str:
+    """
+    @return: The UUID in lowercase hex without dashes, so dashed and undashed forms match
+    """
+    return uuid.replace("-", "").lower()
+
+
+class Whitelist:
+    """
+    Players allowed to wake the backend, loaded from files in the vanilla whitelist.json / ops.json
+    format: a list of {"uuid": ..., "name": ...} objects.
+
+    Names (lowercased) and UUIDs (normalized) are kept in frozen sets, so a lookup is a constant time
+    hash probe however long the list is. The files' mtimes are checked at most every check_interval
+    seconds and the sets are rebuilt when one of them changed.
+    """
+
+    def __init__(self, paths: List[str], check_interval: float = 5.0):
+        self.paths = paths
+        self.check_interval = check_interval
+        self.names: FrozenSet[str] = frozenset()
+        self.uuids: FrozenSet[str] = frozenset()
+        self._watch = FileWatch(paths, check_interval)
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Reload the lists if any of the files has changed since they were last loaded
+        @param force: Check the files even if check_interval has not passed yet
+        """
+        mtimes = self._watch.check(force)
+        if mtimes is None:
+            return
+
+        names = set()
+        uuids = set()
+        try:
+            for path, mtime in zip(self.paths, mtimes):
+                if mtime is None:
+                    continue
+                with open(path) as file:
+                    for entry in json.load(file):
+                        if "name" in entry:
+                            names.add(entry["name"].lower())
+                        if "uuid" in entry:
+                            uuids.add(normalize_uuid(entry["uuid"]))
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            # Possibly caught mid-write, keep the old lists and try again on the next check
+            logger.warning("Could not load whitelist: %s", e)
+            return
+        self.names, self.uuids = frozenset(names), frozenset(uuids)
+        self._watch.commit(mtimes)
+        logger.info("Loaded whitelist with %d names and %d UUIDs", len(self.names), len(self.uuids))
+
+    def allows(self, name: str, uuid: Optional[str]) -> bool:
+        """
+        Whether a player may wake the backend, matching on either UUID or name
+        """
+        self.refresh()
+        if uuid is not None and normalize_uuid(uuid) in self.uuids:
+            return True
+        return name.lower() in self.names
@@ -0,0 +1,100 @@
+import logging
+import multiprocessing
+import signal
+import socket
+from typing import Callable, List
+
+from hibernation import State
+
+logger = logging.getLogger(__name__)
+
+_STATES = list(State)
+_fork = multiprocessing.get_context("fork")
+
+
+class SharedState:
+    """
+    Hibernation state in shared memory, so every worker process sees the same state and only
+    the first one to see a join triggers a wake-up. Create it before starting the workers.
+    Drop-in replacement for hibernation.LocalState.
+    """
+
+    def __init__(self):
+        self._state = _fork.Value("i", _STATES.index(State.HIBERNATING))
+        self._sessions = _fork.Value("i", 0)
+        # time.monotonic() is system wide, so the coordinator can compare it against its own clock
+        self._last_activity = _fork.Value("d", 0.0)
+
+    @property
+    def state(self) -> State:
+        return _STATES[self._state.value]
+
+    @state.setter
+    def state(self, state: State) -> None:
+        self._state.value = _STATES.index(state)
+
+    @property
+    def active_sessions(self) -> int:
+        return self._sessions.value
+
+    @property
+    def last_activity(self) -> float:
+        return self._last_activity.value
+
+    @last_activity.setter
+    def last_activity(self, value: float) -> None:
+        self._last_activity.value = value
+
+    def compare_and_set(self, expected: State, new: State) -> bool:
+        """
+        Move to the new state only if the current state is the expected one, atomically across processes
+        @return: Whether the state was changed
+        """
+        with self._state.get_lock():
+            if self._state.value != _STATES.index(expected):
+                return False
+            self._state.value = _STATES.index(new)
+            return True
+
+    def add_sessions(self, delta: int) -> None:
+        with self._sessions.get_lock():
+            self._sessions.value += delta
+
+
+def reuse_port_available() -> bool:
+    """
+    Whether the kernel can load balance one port over several listening sockets
+    """
+    return hasattr(socket, "SO_REUSEPORT")
+
+
+def start_workers(count: int, target: Callable[[int], None]) -> List[multiprocessing.Process]:
+    """
+    Fork count worker processes, each calling target with its index.
+    Every worker is expected to bind the listening port itself with SO_REUSEPORT.
+    """
+    processes = []
+    for index in range(count):
+        process = _fork.Process(target=target, args=(index,), name=f"worker-{index}", daemon=True)
+        process.start()
+        processes.append(process)
+    logger.info("Started %d workers", count)
+    return processes
+
+
+def stop_workers(processes: List[multiprocessing.Process]) -> None:
+    """
+    Terminate the workers and wait for them to exit
+    """
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(5)
+
+
+def ignore_interrupts() -> None:
+    """
+    Let the parent handle Ctrl+C and terminate the workers, instead of every worker printing a traceback
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)